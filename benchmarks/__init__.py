@@ -0,0 +1,40 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+
+
+def make_genome(n_inputs, n_hidden, n_outputs, seed=0):
+    """
+    Genome with the bias and inputs linked to every hidden node and output, and every hidden
+    node linked to every output, with weights drawn from seed
+    """
+    config = Config()
+    config.num_inputs = n_inputs
+    config.num_outputs = n_outputs
+    inputs = [NodeGene(node_type='INPUT', idx=i + 1) for i in range(n_inputs)]
+    outputs = [NodeGene(node_type='OUTPUT', idx=n_inputs + i + 1) for i in range(n_outputs)]
+    hidden = [NodeGene(node_type='HIDDEN', idx=n_inputs + n_outputs + i + 1, activation='relu')
+              for i in range(n_hidden)]
+    pairs = ([(src, sink.idx) for sink in hidden + outputs for src in [0] + [g.idx for g in inputs]] +
+             [(src.idx, sink.idx) for sink in outputs for src in hidden])
+    weights = np.random.default_rng(seed).normal(size=len(pairs)).tolist()
+    links = [LinkGene(src, sink, weight=weight, innov=innov)
+             for innov, ((src, sink), weight) in enumerate(zip(pairs, weights))]
+    return Genome(config, node_genes=inputs + outputs + hidden, link_genes=links), config
@@ -0,0 +1,45 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Genome benchmarks on fully connected genomes of growing size: Genome.distance and
+FeedForwardPhenome construction, which both look nodes and links up by index.
+
+Run from the repository root with: python -m benchmarks.bench_genome
+"""
+
+import timeit
+
+from benchmarks import make_genome
+from neat.phenome import FeedForwardPhenome
+
+SIZES = [(10, 10), (50, 20), (100, 40), (200, 50)]
+
+
+def main(repeat=3, number=5):
+    print("{0:>8} {1:>8} {2:>8} {3:>14} {4:>14}".format(
+        'inputs', 'outputs', 'links', 'distance (ms)', 'phenome (ms)'))
+    for n_inputs, n_outputs in SIZES:
+        genome, config = make_genome(n_inputs, 0, n_outputs)
+        other, _ = make_genome(n_inputs, 0, n_outputs, seed=1)
+        distance = min(timeit.repeat(lambda: genome.distance(other), repeat=repeat, number=number)) / number
+        phenome = min(timeit.repeat(lambda: FeedForwardPhenome(genome, config),
+                                    repeat=repeat, number=number)) / number
+        print("{0:>8} {1:>8} {2:>8} {3:>14.2f} {4:>14.2f}".format(
+            n_inputs, n_outputs, len(genome.link_genes), distance * 1e3, phenome * 1e3))
+
+
+if __name__ == '__main__':
+    main()
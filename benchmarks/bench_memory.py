@@ -0,0 +1,79 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Genome memory benchmark: bytes allocated per genome, measured with tracemalloc, for
+object genomes (one NodeGene/LinkGene per gene) and array-backed genomes.
+
+Run from the repository root with: python -m benchmarks.bench_memory
+"""
+
+import gc
+import tracemalloc
+
+import numpy as np
+
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import ArrayGenome, Genome
+
+SIZES = [(2, 2), (10, 10), (30, 10), (50, 20)]
+
+
+def bytes_per_genome(build, count):
+    """Memory held by count genomes made by build(), per genome"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    genomes = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del genomes
+    return (after - before) / count
+
+
+def main(count=200):
+    print("{0:>8} {1:>8} {2:>8} {3:>16} {4:>16} {5:>8}".format(
+        'inputs', 'outputs', 'links', 'Genome (B)', 'ArrayGenome (B)', 'ratio'))
+    for n_inputs, n_outputs in SIZES:
+        config = Config()
+        config.num_inputs = n_inputs
+        config.num_outputs = n_outputs
+        template = Genome(config)
+        links = template.link_genes
+
+        # Fresh genes and weights per genome, so nothing is shared between genomes
+        def build_objects():
+            nodes = [NodeGene(idx=g.idx, node_type=g.node_type, activation=g.activation)
+                     for g in template.node_genes()]
+            return Genome.from_validated(config, nodes, [
+                LinkGene(g.src, g.sink, weight=weight, innov=g.innovation_number + 1000)
+                for g, weight in zip(links, np.random.random(len(links)).tolist())])
+
+        def build_arrays():
+            nodes = [NodeGene(idx=g.idx, node_type=g.node_type, activation=g.activation)
+                     for g in template.node_genes()]
+            return ArrayGenome.from_arrays(config, nodes, [g.src for g in links], [g.sink for g in links],
+                                           np.random.random(len(links)), np.ones(len(links), dtype=bool),
+                                           [g.innovation_number + 1000 for g in links])
+
+        objects = bytes_per_genome(build_objects, count)
+        arrays = bytes_per_genome(build_arrays, count)
+        print("{0:>8} {1:>8} {2:>8} {3:>16.0f} {4:>16.0f} {5:>7.1f}x".format(
+            n_inputs, n_outputs, len(links), objects, arrays, objects / arrays))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Phenome benchmarks:
+ - construction: the construct -> evaluate -> discard path against construction that
+   also builds the networkx graph, as every phenome used to
+ - latency: single-sample serial_activate against the generated-code backend
+
+Run from the repository root with: python -m benchmarks.bench_phenome
+"""
+
+import timeit
+
+from benchmarks import make_genome
+from neat.codegen import GeneratedPhenome
+from neat.phenome import FeedForwardPhenome
+
+SIZES = [(2, 2), (10, 5), (50, 10), (200, 20)]
+
+
+def construct(genome, config):
+    FeedForwardPhenome(genome, config)
+
+
+def construct_with_graph(genome, config):
+    FeedForwardPhenome(genome, config).graph
+
+
+def construction(repeat=5, number=50):
+    print("{0:>8} {1:>8} {2:>8} {3:>14} {4:>14} {5:>8}".format(
+        'inputs', 'outputs', 'links', 'lazy (us)', 'graph (us)', 'speedup'))
+    for n_inputs, n_outputs in SIZES:
+        genome, config = make_genome(n_inputs, 0, n_outputs)
+        lazy = min(timeit.repeat(lambda: construct(genome, config), repeat=repeat, number=number)) / number
+        eager = min(timeit.repeat(lambda: construct_with_graph(genome, config), repeat=repeat, number=number)) / number
+        print("{0:>8} {1:>8} {2:>8} {3:>14.1f} {4:>14.1f} {5:>7.2f}x".format(
+            n_inputs, n_outputs, len(genome.link_genes), lazy * 1e6, eager * 1e6, eager / lazy))
+
+
+def latency(repeat=5, number=1000):
+    print("{0:>8} {1:>8} {2:>8} {3:>14} {4:>14} {5:>8}".format(
+        'inputs', 'outputs', 'links', 'serial (us)', 'codegen (us)', 'speedup'))
+    for n_inputs, n_outputs in SIZES:
+        genome, config = make_genome(n_inputs, 0, n_outputs)
+        phenome = FeedForwardPhenome(genome, config)
+        generated = GeneratedPhenome(genome, config)
+        inputs = [0.5] * n_inputs
+        serial = min(timeit.repeat(lambda: phenome.serial_activate(inputs), repeat=repeat, number=number)) / number
+        compiled = min(timeit.repeat(lambda: generated.serial_activate(inputs), repeat=repeat, number=number)) / number
+        print("{0:>8} {1:>8} {2:>8} {3:>14.2f} {4:>14.2f} {5:>7.2f}x".format(
+            n_inputs, n_outputs, len(genome.link_genes), serial * 1e6, compiled * 1e6, serial / compiled))
+
+
+def main():
+    construction()
+    print()
+    latency()
+
+
+if __name__ == '__main__':
+    main()
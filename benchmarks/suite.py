@@ -0,0 +1,198 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark suite for the hot paths, over genomes of growing size (inputs, hidden nodes, outputs):
+ - phenome_construction: FeedForwardPhenome(genome, config)
+ - serial_activate: one sample through a phenome
+ - find_feed_forward_layers: layering of the genome's links
+ - genome_distance: Genome.distance to a genome with other weights and hidden nodes
+ - genome_construction: Genome(config, node_genes=..., link_genes=...), with validation
+ - activation/<name>: each activation function, scalar and vectorized
+
+Results are written as JSON (bench_output.json) and as a table (bench_output.txt).  Passing
+a previous JSON file as --baseline flags every benchmark that got slower by more than
+--threshold, and the exit status is 1 if any did.
+
+Run from the repository root with: python -m benchmarks.suite [--quick] [--baseline FILE]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from benchmarks import make_genome
+from neat import activation_functions
+from neat.activations import activation_types
+from neat.genome import Genome
+from neat.phenome import FeedForwardPhenome, find_feed_forward_layers
+
+# (inputs, hidden, outputs)
+SIZES = [(2, 0, 1), (10, 5, 2), (50, 20, 5), (200, 50, 10)]
+QUICK_SIZES = SIZES[:3]
+
+
+def time_call(func, repeat, min_time):
+    """Best time per call over repeat runs of a loop lasting at least min_time seconds"""
+    number = 1
+    while True:
+        elapsed = timeit.timeit(func, number=number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(1.2 * min_time / elapsed))
+    return min([elapsed] + timeit.repeat(func, repeat=repeat - 1, number=number)) / number
+
+
+def genome_benchmarks(n_inputs, n_hidden, n_outputs):
+    """(name, function, parameters) for the genome and phenome paths at one size"""
+    genome, config = make_genome(n_inputs, n_hidden, n_outputs)
+    # Half the hidden nodes and other weights: a mix of matching and unmatched genes
+    other, _ = make_genome(n_inputs, n_hidden // 2, n_outputs, seed=1)
+    phenome = FeedForwardPhenome(genome, config)
+    inputs = [0.5] * n_inputs
+    phenome.serial_activate(inputs)
+    input_ids = [g.idx for g in genome.input_genes]
+    output_ids = [g.idx for g in genome.output_genes]
+    links = [(g.src, g.sink) for g in genome.link_genes]
+    node_genes = genome.node_genes()
+    link_genes = genome.link_genes
+    label = "{0}x{1}x{2}".format(n_inputs, n_hidden, n_outputs)
+    params = {'inputs': n_inputs, 'hidden': n_hidden, 'outputs': n_outputs, 'links': genome.n_links}
+    return [
+        ('phenome_construction/' + label, lambda: FeedForwardPhenome(genome, config), params),
+        ('serial_activate/' + label, lambda: phenome.serial_activate(inputs), params),
+        ('find_feed_forward_layers/' + label, lambda: find_feed_forward_layers(input_ids, links, output_ids), params),
+        ('genome_distance/' + label, lambda: genome.distance(other), params),
+        ('genome_construction/' + label,
+         lambda: Genome(config, node_genes=node_genes, link_genes=link_genes), params),
+    ]
+
+
+def activation_benchmarks(n_values=1000):
+    """(name, function, parameters) for every activation function, on n_values values"""
+    values = np.random.default_rng(0).uniform(-3.0, 3.0, n_values)
+    scalars = values.tolist()
+    benchmarks = []
+    for name in activation_types:
+        scalar = activation_functions.get(name)
+        vectorized = activation_functions.get_vectorized(name)
+        params = {'values': n_values}
+        benchmarks.append(('activation/{0}/scalar'.format(name),
+                           lambda scalar=scalar: [scalar(x) for x in scalars], params))
+        benchmarks.append(('activation/{0}/vectorized'.format(name),
+                           lambda vectorized=vectorized: vectorized(values.copy()), params))
+    return benchmarks
+
+
+def run(quick=False, pattern=None, log=None):
+    """
+    Runs the suite
+
+    :param quick: fewer sizes, repeats and shorter loops
+    :param pattern: only run benchmarks whose name contains this string
+    :param log: function called with each benchmark name as it starts
+    :return: dict name -> {'seconds': best time per call, 'params': dict}
+    """
+    repeat, min_time = (3, 0.01) if quick else (5, 0.05)
+    benchmarks = []
+    for size in QUICK_SIZES if quick else SIZES:
+        benchmarks.extend(genome_benchmarks(*size))
+    benchmarks.extend(activation_benchmarks())
+
+    results = {}
+    for name, func, params in benchmarks:
+        if pattern is not None and pattern not in name:
+            continue
+        if log is not None:
+            log(name)
+        results[name] = {'seconds': time_call(func, repeat, min_time), 'params': params}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Benchmarks present in both runs, with the ratio of current to baseline time
+
+    :param results: dict from run
+    :param baseline: dict from run, e.g. the 'results' of a saved JSON file
+    :param threshold: relative slowdown above which a benchmark is a regression, e.g. 0.2
+    :return: list of (name, baseline seconds, seconds, ratio, is_regression)
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['seconds'], result['seconds']
+        ratio = after / before if before > 0 else float('inf')
+        rows.append((name, before, after, ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def format_results(results, comparison=None):
+    """Results as a text table, with the baseline comparison if given"""
+    compared = {row[0]: row for row in comparison or []}
+    lines = ["{0:<46} {1:>8} {2:>14} {3:>14} {4:>8}".format('benchmark', 'links', 'time (us)', 'baseline (us)',
+                                                           'ratio')]
+    for name, result in results.items():
+        links = result['params'].get('links', '')
+        row = compared.get(name)
+        if row is None:
+            lines.append("{0:<46} {1:>8} {2:>14.2f}".format(name, links, result['seconds'] * 1e6))
+        else:
+            lines.append("{0:<46} {1:>8} {2:>14.2f} {3:>14.2f} {4:>7.2f}x{5}".format(
+                name, links, row[2] * 1e6, row[1] * 1e6, row[3], '  REGRESSION' if row[4] else ''))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the neat hot paths")
+    parser.add_argument('--quick', action='store_true', help="fewer sizes and shorter timings")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this string")
+    parser.add_argument('--json', default='bench_output.json', help="JSON results file")
+    parser.add_argument('--text', default='bench_output.txt', help="text results file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown flagged as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run(quick=args.quick, pattern=args.filter, log=lambda name: print(name, file=sys.stderr))
+    comparison = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            comparison = compare(results, json.load(f)['results'], args.threshold)
+
+    with open(args.json, 'w') as f:
+        json.dump({'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                   'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=1)
+    table = format_results(results, comparison)
+    with open(args.text, 'w') as f:
+        f.write(table + '\n')
+    print(table)
+
+    regressions = [row[0] for row in comparison or [] if row[4]]
+    if regressions:
+        print("\n{0} regression(s) above {1:.0%}: {2}".format(len(regressions), args.threshold,
+                                                              ', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -45,18 +45,18 @@ from neat import activations
 
 activation_functions = activations.ActivationFunctionSet()
 
-activation_functions.add('sigmoid', activations.sigmoid_activation)
-activation_functions.add('tanh', activations.tanh_activation)
-activation_functions.add('sin', activations.sin_activation)
-activation_functions.add('gauss', activations.gauss_activation)
-activation_functions.add('relu', activations.relu_activation)
-activation_functions.add('identity', activations.identity_activation)
-activation_functions.add('clamped', activations.clamped_activation)
-activation_functions.add('inv', activations.inv_activation)
-activation_functions.add('log', activations.log_activation)
-activation_functions.add('exp', activations.exp_activation)
-activation_functions.add('abs', activations.abs_activation)
-activation_functions.add('hat', activations.hat_activation)
-activation_functions.add('square', activations.square_activation)
-activation_functions.add('cube', activations.cube_activation)
+activation_functions.add('sigmoid', activations.sigmoid_activation, activations.sigmoid_activation_vec)
+activation_functions.add('tanh', activations.tanh_activation, activations.tanh_activation_vec)
+activation_functions.add('sin', activations.sin_activation, activations.sin_activation_vec)
+activation_functions.add('gauss', activations.gauss_activation, activations.gauss_activation_vec)
+activation_functions.add('relu', activations.relu_activation, activations.relu_activation_vec)
+activation_functions.add('identity', activations.identity_activation, activations.identity_activation_vec)
+activation_functions.add('clamped', activations.clamped_activation, activations.clamped_activation_vec)
+activation_functions.add('inv', activations.inv_activation, activations.inv_activation_vec)
+activation_functions.add('log', activations.log_activation, activations.log_activation_vec)
+activation_functions.add('exp', activations.exp_activation, activations.exp_activation_vec)
+activation_functions.add('abs', activations.abs_activation, activations.abs_activation_vec)
+activation_functions.add('hat', activations.hat_activation, activations.hat_activation_vec)
+activation_functions.add('square', activations.square_activation, activations.square_activation_vec)
+activation_functions.add('cube', activations.cube_activation, activations.cube_activation_vec)
 
@@ -41,34 +41,38 @@
 #   CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 #   SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import math
+
 import numpy as np
 
 activation_types = ['sigmoid', 'tanh', 'sin', 'gauss', 'relu', 'identity', 'clamped',
                     'inv', 'log', 'exp', 'abs', 'hat', 'square', 'cube']
 
+_GAUSS_NORM = math.sqrt(2 * math.pi)
+
 
 def sigmoid_activation(z):
     z = max(-60.0, min(60.0, z))
-    return 1.0 / (1.0 + np.exp(-z))
+    return 1.0 / (1.0 + math.exp(-z))
 
 
 def tanh_activation(z):
     z = max(-60.0, min(60.0, z))
-    return np.tanh(z)
+    return math.tanh(z)
 
 
 def sin_activation(z):
     z = max(-60.0, min(60.0, z))
-    return np.sin(z)
+    return math.sin(z)
 
 
 def gauss_activation(z):
     z = max(-60.0, min(60.0, z))
-    return np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+    return math.exp(-0.5 * z ** 2) / _GAUSS_NORM
 
 
 def relu_activation(z):
-    return z if z > 0.0 else 0
+    return z if z > 0.0 else 0.0
 
 
 def identity_activation(z):
@@ -88,12 +92,12 @@ def inv_activation(z):
 
 def log_activation(z):
     z = max(1e-7, z)
-    return np.log(z)
+    return math.log(z)
 
 
 def exp_activation(z):
     z = max(-60.0, min(60.0, z))
-    return np.exp(z)
+    return math.exp(z)
 
 
 def abs_activation(z):
@@ -112,6 +116,79 @@ def cube_activation(z):
     return z ** 3
 
 
+# Vectorized forms: each takes a float ndarray, overwrites it with the activation and returns it.
+
+def sigmoid_activation_vec(z):
+    np.clip(z, -60.0, 60.0, out=z)
+    z *= -1.0
+    np.exp(z, out=z)
+    z += 1.0
+    return np.reciprocal(z, out=z)
+
+
+def tanh_activation_vec(z):
+    np.clip(z, -60.0, 60.0, out=z)
+    return np.tanh(z, out=z)
+
+
+def sin_activation_vec(z):
+    np.clip(z, -60.0, 60.0, out=z)
+    return np.sin(z, out=z)
+
+
+def gauss_activation_vec(z):
+    np.clip(z, -60.0, 60.0, out=z)
+    np.square(z, out=z)
+    z *= -0.5
+    np.exp(z, out=z)
+    z /= _GAUSS_NORM
+    return z
+
+
+def relu_activation_vec(z):
+    return np.maximum(z, 0.0, out=z)
+
+
+def identity_activation_vec(z):
+    return z
+
+
+def clamped_activation_vec(z):
+    return np.clip(z, -1.0, 1.0, out=z)
+
+
+def inv_activation_vec(z):
+    return np.divide(1.0, z, out=z, where=z != 0)
+
+
+def log_activation_vec(z):
+    np.maximum(z, 1e-7, out=z)
+    return np.log(z, out=z)
+
+
+def exp_activation_vec(z):
+    np.clip(z, -60.0, 60.0, out=z)
+    return np.exp(z, out=z)
+
+
+def abs_activation_vec(z):
+    return np.abs(z, out=z)
+
+
+def hat_activation_vec(z):
+    np.abs(z, out=z)
+    np.subtract(1.0, z, out=z)
+    return np.maximum(z, 0.0, out=z)
+
+
+def square_activation_vec(z):
+    return np.square(z, out=z)
+
+
+def cube_activation_vec(z):
+    return np.power(z, 3, out=z)
+
+
 class InvalidActivationFunction(Exception):
     pass
 
@@ -119,10 +196,22 @@ class InvalidActivationFunction(Exception):
 class ActivationFunctionSet(object):
     def __init__(self):
         self.functions = {}
+        self.vectorized_functions = {}
 
-    def add(self, config_name, function):
+    def add(self, config_name, function, vectorized_function=None):
+        """
+        Registers an activation function
+
+        :param config_name: name used in configuration files
+        :param function: scalar function, float -> float
+        :param vectorized_function: in-place function on float ndarrays; if omitted the scalar
+                                    function is applied element-wise, which is much slower
+        """
         # TODO: Verify that the given function has the correct signature.
         self.functions[config_name] = function
+        if vectorized_function is None:
+            vectorized_function = np.vectorize(function, otypes=[float])
+        self.vectorized_functions[config_name] = vectorized_function
 
     def get(self, config_name):
         f = self.functions.get(config_name)
@@ -131,5 +220,12 @@ class ActivationFunctionSet(object):
 
         return f
 
+    def get_vectorized(self, config_name):
+        f = self.vectorized_functions.get(config_name)
+        if f is None:
+            raise InvalidActivationFunction("No such function: {0!r}".format(config_name))
+
+        return f
+
     def is_valid(self, config_name):
         return config_name in self.functions
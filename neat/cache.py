@@ -0,0 +1,324 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+import sys
+
+import numpy as np
+
+from neat import reporting
+from neat.phenome import FeedForwardPhenome
+
+
+class LRUCache:
+    def __init__(self, max_entries, *, max_bytes=None, sizeof=None):
+        """
+        LRUCache - bounded mapping that evicts the least recently used entry and
+        counts hits and misses
+
+        :param max_entries: maximum number of entries kept, None for no limit
+        :param max_bytes: maximum total size of the values, None for no limit
+        :param sizeof: function value -> size in bytes, required with max_bytes
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("Cache needs room for at least one entry")
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("A byte budget needs a sizeof function")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+
+    def get(self, key, default=None):
+        """Returns the value cached under key, counting a hit, or default, counting a miss"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Caches value under key, evicting the least recently used entries beyond max_entries
+        or max_bytes.  The newest entry is always kept, even if larger than max_bytes.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if self.sizeof is not None:
+            size = self.sizeof(value)
+            self.n_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+        while len(self._entries) > 1 and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_bytes is not None and self.n_bytes > self.max_bytes)):
+            old_key, _ = self._entries.popitem(last=False)
+            self.n_bytes -= self._sizes.pop(old_key, 0)
+            self.evictions += 1
+
+    def clear(self):
+        """Drops every entry, keeping the statistics"""
+        self._entries.clear()
+        self._sizes.clear()
+        self.n_bytes = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that were hits, 0 before any lookup"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+def phenome_key(genome):
+    """
+    Hashable key of everything a FeedForwardPhenome is built from: the nodes with their
+    types and activations, and the links in the genome's innovation order with their
+    enabled flags and, when enabled, their weights.  Disabled links are part of the key
+    because they still take part in layering.  Genomes with the same key give bit-identical
+    outputs; Genomes and ArrayGenomes of the same network have the same key.
+
+    The key is (number of nodes, number of links, 64-bit hash of the genes), small enough
+    to keep for every cached phenome.
+    """
+    nodes = tuple([(gene.idx, gene.node_type, gene.activation) for gene in genome.node_genes()])
+    if hasattr(genome, 'link_weight'):
+        enabled = genome.link_enabled
+        links = tuple(zip(genome.link_src.tolist(), genome.link_sink.tolist(), enabled.tolist(),
+                          np.where(enabled, genome.link_weight, 0.0).tolist()))
+    else:
+        links = tuple([(gene.src, gene.sink, gene.enabled, gene.weight if gene.enabled else 0.0)
+                       for gene in genome.link_genes])
+    return len(nodes), len(links), hash((nodes, links))
+
+
+def estimate_size(obj):
+    """
+    Approximate memory held by an object such as a phenome: the object, its attributes and
+    everything reachable from them through lists, tuples, sets and dicts, each counted once.
+    Arrays count their buffer unless they are views.
+    """
+    seen = set()
+    size = sys.getsizeof(obj)
+    stack = list(getattr(obj, '__dict__', {}).values())
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+    return size
+
+
+class PhenomeCache:
+    def __init__(self, config, *, max_entries=10000, max_bytes=None, phenome_class=FeedForwardPhenome):
+        """
+        PhenomeCache - reuses phenomes of genomes whose networks are unchanged, such as elites
+        and offspring carried over between generations
+
+        Phenomes are looked up by phenome_key and evicted least recently used first once
+        there are more than max_entries, or once their estimated sizes add up to more than
+        max_bytes.  With a byte budget, phenomes with a prepare method have it called before
+        they are measured, so the evaluation tables they would build lazily are counted too.
+        Cached phenomes are shared, so they must not be modified.
+
+        :param config: configuration the phenomes are built with
+        :param max_entries: maximum number of phenomes, None for no limit
+        :param max_bytes: maximum total estimated size of the phenomes, None for no limit
+        :param phenome_class: class called as phenome_class(genome, config) on a miss
+        """
+        self.config = config
+        self.phenome_class = phenome_class
+        self.cache = LRUCache(max_entries, max_bytes=max_bytes,
+                              sizeof=estimate_size if max_bytes is not None else None)
+
+    def get(self, genome):
+        """Phenome of the genome, built on a miss"""
+        key = phenome_key(genome)
+        phenome = self.cache.get(key)
+        if phenome is None:
+            reporting.count('phenome_cache_misses')
+            phenome = self.phenome_class(genome, self.config)
+            if self.cache.max_bytes is not None and hasattr(phenome, 'prepare'):
+                phenome.prepare()
+            self.cache.put(key, phenome)
+        else:
+            reporting.count('phenome_cache_hits')
+        return phenome
+
+    @property
+    def hits(self):
+        return self.cache.hits
+
+    @property
+    def misses(self):
+        return self.cache.misses
+
+    @property
+    def evictions(self):
+        return self.cache.evictions
+
+    @property
+    def hit_rate(self):
+        return self.cache.hit_rate
+
+    @property
+    def n_bytes(self):
+        """Estimated size of the cached phenomes, counted only with a byte budget"""
+        return self.cache.n_bytes
+
+    def stats(self):
+        """Dict of entries, hits, misses, evictions, hit_rate and n_bytes"""
+        return {'entries': len(self.cache), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hit_rate, 'n_bytes': self.n_bytes}
+
+    def clear(self):
+        """Drops every phenome, keeping the statistics"""
+        self.cache.clear()
+
+    def __len__(self):
+        return len(self.cache)
+
+
+_MISSING = object()
+
+
+class FitnessCache:
+    def __init__(self, *, max_entries=100000, version=None):
+        """
+        FitnessCache - remembers the fitness of networks for deterministic fitness functions, so
+        clones and elites are not evaluated again
+
+        Fitness values are looked up by phenome_key, so only the network counts: genomes that
+        differ only in the weights of disabled links share a fitness.  The cache empties itself
+        when it is used with a different fitness function or set to a different version, for
+        instance when the dataset the fitness function reads changes.
+
+        :param max_entries: maximum number of fitness values, None for no limit
+        :param version: anything comparable that identifies the data the fitness depends on
+        """
+        self.version = version
+        self.fitness_function = None
+        self.evaluations_saved = 0
+        self.cache = LRUCache(max_entries)
+
+    def set_version(self, version):
+        """Sets the data version, dropping every fitness value if it changed"""
+        if version != self.version:
+            self.cache.clear()
+            self.version = version
+
+    def lookup(self, genomes, fitness_function=None):
+        """
+        Finds the cached fitness of each genome.  Clones of a genome that has to be evaluated
+        are only evaluated once, so they count as saved evaluations as well.
+
+        :param genomes: list of genomes
+        :param fitness_function: function the fitness values come from; a different one than
+                                 in the previous call empties the cache
+        :return: (fitnesses, pending) where fitnesses holds the cached fitness of each genome or
+                 None, and pending maps the key of each network still to be evaluated to the
+                 indices of its genomes
+        """
+        if fitness_function is not None and fitness_function != self.fitness_function:
+            self.cache.clear()
+            self.fitness_function = fitness_function
+        fitnesses = [None] * len(genomes)
+        pending = {}
+        for i, genome in enumerate(genomes):
+            key = phenome_key(genome)
+            if key in pending:
+                pending[key].append(i)
+                continue
+            fitness = self.cache.get(key, _MISSING)
+            if fitness is _MISSING:
+                pending[key] = [i]
+            else:
+                fitnesses[i] = fitness
+        saved = len(genomes) - len(pending)
+        self.evaluations_saved += saved
+        reporting.count('evaluations_saved', saved)
+        return fitnesses, pending
+
+    def store(self, fitnesses, pending, new_fitnesses, *, uncached=()):
+        """
+        Caches the fitness of the pending networks and fills it in for all their genomes
+
+        :param fitnesses: list returned by lookup, updated in place
+        :param pending: dict returned by lookup
+        :param new_fitnesses: fitness of one genome per pending network, in the order of pending
+        :param uncached: positions in pending whose fitness is filled in but not cached
+        """
+        for j, ((key, indices), fitness) in enumerate(zip(pending.items(), new_fitnesses)):
+            if j not in uncached:
+                self.cache.put(key, fitness)
+            for i in indices:
+                fitnesses[i] = fitness
+
+    def evaluate(self, genomes, evaluate, fitness_function=None):
+        """
+        Fitness of every genome, calling evaluate only on one genome per uncached network
+
+        :param genomes: list of genomes
+        :param evaluate: function list of genomes -> list of fitness values
+        :param fitness_function: function the fitness values come from, see lookup
+        :return: list of fitness values, in the order of genomes
+        """
+        fitnesses, pending = self.lookup(genomes, fitness_function)
+        if pending:
+            self.store(fitnesses, pending, evaluate([genomes[indices[0]] for indices in pending.values()]))
+        return fitnesses
+
+    @property
+    def hits(self):
+        return self.cache.hits
+
+    @property
+    def misses(self):
+        return self.cache.misses
+
+    def stats(self):
+        """Dict of entries, hits, misses, evictions and evaluations_saved"""
+        return {'entries': len(self.cache), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.cache.evictions, 'evaluations_saved': self.evaluations_saved}
+
+    def clear(self):
+        """Drops every fitness value, keeping the statistics"""
+        self.cache.clear()
+
+    def __len__(self):
+        return len(self.cache)
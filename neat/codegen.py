@@ -0,0 +1,162 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+import math
+
+from neat import activation_functions
+from neat.activations import activation_types
+from neat.phenome import FeedForwardPhenome
+
+# Number of generated evaluation functions kept, one per distinct network structure
+CACHE_SIZE = 1024
+
+# Terms per generated statement; the compiler recurses once per term of a sum
+SUM_CHUNK = 200
+
+_CLAMP = "{z} = -60.0 if {z} < -60.0 else (60.0 if {z} > 60.0 else {z})"
+
+# Inlined activations: (clamp to [-60, 60] first, expression), matching activations.py exactly
+_INLINE_ACTIVATIONS = {
+    'sigmoid': (True, "1.0 / (1.0 + exp(-{z}))"),
+    'tanh': (True, "tanh({z})"),
+    'sin': (True, "sin({z})"),
+    'gauss': (True, "exp(-0.5 * {z} ** 2) / GAUSS_NORM"),
+    'relu': (False, "{z} if {z} > 0.0 else 0.0"),
+    'identity': (False, "{z}"),
+    'clamped': (False, "-1.0 if {z} < -1.0 else (1.0 if {z} > 1.0 else {z})"),
+    'inv': (False, "1.0 / {z} if {z} != 0 else 0.0"),
+    'log': (False, "log({z} if {z} > 1e-7 else 1e-7)"),
+    'exp': (True, "exp({z})"),
+    'abs': (False, "abs({z})"),
+    'hat': (False, "max(0.0, 1 - abs({z}))"),
+    'square': (False, "{z} ** 2"),
+    'cube': (False, "{z} ** 3"),
+}
+
+_factories = OrderedDict()
+
+
+def structure_key(phenome):
+    """Hashable description of a compiled phenome's topology and activations, ignoring weights"""
+    return (len(phenome.input_nodes),
+            tuple(phenome.indptr.tolist()),
+            tuple(phenome.src.tolist()),
+            tuple(phenome.activation.tolist()),
+            tuple(phenome.output_index.tolist()))
+
+
+def generate_source(phenome):
+    """
+    Python source for a compiled phenome: make(w) binds the weights w and returns
+    activate(inputs), a straight-line function with every weighted sum unrolled.
+    Weighted sums add terms in the same order as serial_activate, so results are identical;
+    long sums are split into statements of SUM_CHUNK terms to keep the compiler's recursion shallow.
+    """
+    n_inputs = len(phenome.input_nodes)
+    indptr = phenome.indptr.tolist()
+    src = phenome.src.tolist()
+    n_values = len(phenome.node_order)
+
+    def value(pos):
+        return "1.0" if pos == 0 else "v{0}".format(pos)
+
+    lines = ["def make(w):"]
+    if len(src) > 0:
+        lines.append("    {0}, = w".format(", ".join("w{0}".format(k) for k in range(len(src)))))
+    lines.append("    def activate(inputs):")
+    if n_inputs > 0:
+        lines.append("        {0}, = inputs".format(", ".join(value(pos) for pos in range(1, 1 + n_inputs))))
+    for k, act in enumerate(phenome.activation.tolist()):
+        terms = ["{0} * w{1}".format(value(src[i]), i) for i in range(indptr[k], indptr[k + 1])]
+        lines.append("        z = " + (" + ".join(terms[:SUM_CHUNK]) if terms else "0.0"))
+        for start in range(SUM_CHUNK, len(terms), SUM_CHUNK):
+            lines.append("        z = z + " + " + ".join(terms[start:start + SUM_CHUNK]))
+        name = activation_types[act]
+        clamp, expression = _INLINE_ACTIVATIONS.get(name, (False, "f_" + name + "({z})"))
+        if clamp:
+            lines.append("        " + _CLAMP.format(z="z"))
+        lines.append("        v{0} = {1}".format(phenome.first_eval + k, expression.format(z="z")))
+    unevaluated = range(phenome.first_eval + len(indptr) - 1, n_values)
+    for pos in unevaluated:
+        lines.append("        v{0} = 0.0".format(pos))
+    lines.append("        return [{0}]".format(", ".join(value(pos) for pos in phenome.output_index.tolist())))
+    lines.append("    return activate")
+    return "\n".join(lines) + "\n"
+
+
+def _get_factory(phenome):
+    """Compiles, or fetches from the cache, the make(w) function for a phenome's structure"""
+    key = structure_key(phenome)
+    factory = _factories.get(key)
+    if factory is not None:
+        _factories.move_to_end(key)
+        return factory
+
+    namespace = {'exp': math.exp, 'tanh': math.tanh, 'sin': math.sin, 'log': math.log,
+                 'GAUSS_NORM': math.sqrt(2 * math.pi)}
+    for name in activation_types:
+        namespace['f_' + name] = activation_functions.get(name)
+    exec(compile(generate_source(phenome), '<neat.codegen>', 'exec'), namespace)
+    factory = namespace['make']
+
+    _factories[key] = factory
+    if len(_factories) > CACHE_SIZE:
+        _factories.popitem(last=False)
+    return factory
+
+
+def clear_cache():
+    """Drops every cached evaluation function"""
+    _factories.clear()
+
+
+class GeneratedPhenome:
+    def __init__(self, genome, config):
+        """
+        GeneratedPhenome - a feed-forward network compiled to a generated Python function
+
+        Meant for low single-sample latency; genomes with the same structure share the
+        generated code and only bind their own weights.
+
+        :param genome: the genome to create the phenome
+        :param config: configuration
+        """
+        self.phenome = FeedForwardPhenome(genome, config)
+        self.input_nodes = self.phenome.input_nodes
+        self.output_nodes = self.phenome.output_nodes
+        self._bind()
+
+    def _bind(self):
+        self._activate = _get_factory(self.phenome)(tuple(self.phenome.weight.tolist()))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_activate']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
+    def serial_activate(self, inputs):
+        """
+        serial_activate - gives network output for an input
+        :param inputs: numerical input list
+        :return: numerical output list
+        """
+        if len(self.input_nodes) != len(inputs):
+            raise ValueError("Expected {0} inputs, got {1}".format(len(self.input_nodes), len(inputs)))
+        return self._activate(inputs)
@@ -0,0 +1,67 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from neat import reporting
+from neat.genome import ArrayGenome, Genome
+
+
+def crossover(parent1, parent2, rng=None):
+    """
+    Child of two genomes.  Links are aligned by innovation number in one merge pass over
+    both parents' sorted link genes: matching genes are inherited from either parent at
+    random, disjoint and excess genes from the fitter parent (parent1 on ties), and nodes
+    from the fitter parent.  The child is built without re-validation, and is an
+    ArrayGenome if both parents are.
+
+    :param parent1: genome
+    :param parent2: genome
+    :param rng: numpy Generator or RandomState, defaults to numpy.random
+    :return: new genome with fitness 0, sharing no genes with the parents
+    """
+    reporting.count('offspring')
+    rng = np.random if rng is None else rng
+    if parent2.fitness > parent1.fitness:
+        parent1, parent2 = parent2, parent1
+    node_genes = [gene.copy() for gene in parent1.node_genes()]
+
+    if isinstance(parent1, ArrayGenome) and isinstance(parent2, ArrayGenome):
+        innovation1, innovation2 = parent1.link_innovation, parent2.link_innovation
+    else:
+        links1, links2 = parent1.link_genes, parent2.link_genes
+        innovation1 = np.array([gene.innovation_number for gene in links1], dtype=np.int64)
+        innovation2 = np.array([gene.innovation_number for gene in links2], dtype=np.int64)
+
+    # Merge of the two sorted innovation lists: row of each parent1 gene's innovation in
+    # parent2, clipped so that missing ones can be compared
+    rows = np.minimum(np.searchsorted(innovation2, innovation1), max(len(innovation2) - 1, 0))
+    if len(innovation2):
+        matching = innovation2[rows] == innovation1
+    else:
+        matching = np.zeros(len(innovation1), dtype=bool)
+    from_parent2 = matching & (rng.random(len(innovation1)) < 0.5)
+
+    if isinstance(parent1, ArrayGenome) and isinstance(parent2, ArrayGenome):
+        weight = parent1.link_weight.copy()
+        enabled = parent1.link_enabled.copy()
+        weight[from_parent2] = parent2.link_weight[rows[from_parent2]]
+        enabled[from_parent2] = parent2.link_enabled[rows[from_parent2]]
+        return ArrayGenome.from_arrays(parent1.config, node_genes, parent1.link_src, parent1.link_sink,
+                                       weight, enabled, innovation1)
+
+    link_genes = [(links2[row] if take else gene).copy()
+                  for gene, row, take in zip(links1, rows.tolist(), from_parent2.tolist())]
+    return Genome.from_validated(parent1.config, node_genes, link_genes)
@@ -0,0 +1,320 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import os
+
+import numpy as np
+
+from neat import activation_functions, reporting
+from neat.activations import activation_types
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+from neat.phenome import FeedForwardPhenome
+from neat.serialization import ACTIVATION_IDS, NODE_TYPES, NODE_TYPE_IDS
+
+
+def pack_genome(genome):
+    """
+    Compact picklable form of a genome without its Config: an int array of
+    (idx, node type, activation) rows and a float array of (src, sink, weight, enabled, innovation) rows
+    """
+    nodes = np.array([(g.idx, NODE_TYPE_IDS[g.node_type], ACTIVATION_IDS[g.activation])
+                      for g in genome.node_genes()], dtype=np.int64).reshape(-1, 3)
+    links = np.array([(g.src, g.sink, g.weight, g.enabled, g.innovation_number)
+                      for g in genome.link_genes], dtype=float).reshape(-1, 5)
+    return nodes, links
+
+
+def unpack_genome(payload, config):
+    """Rebuilds a genome from pack_genome output"""
+    nodes, links = payload
+    node_genes = [NodeGene(idx=idx, node_type=NODE_TYPES[node_type], activation=activation_types[activation])
+                  for idx, node_type, activation in nodes.tolist()]
+    link_genes = [LinkGene(int(src), int(sink), weight=weight, enabled=bool(enabled), innov=int(innov))
+                  for src, sink, weight, enabled, innov in links.tolist()]
+    return Genome.from_validated(config, node_genes, link_genes)
+
+
+# Per-process state of ParallelEvaluator workers, set once by the pool initializer
+_worker_fitness_function = None
+_worker_config = None
+
+
+def _init_worker(fitness_function, config):
+    global _worker_fitness_function, _worker_config
+    _worker_fitness_function = fitness_function
+    _worker_config = config
+
+
+def _evaluate_payloads(payloads):
+    return [_worker_fitness_function(unpack_genome(payload, _worker_config)) for payload in payloads]
+
+
+class ParallelEvaluator:
+    def __init__(self, fitness_function, config, *, num_workers=None, chunk_size=None, fitness_cache=None):
+        """
+        ParallelEvaluator - evaluates genome fitness on a pool of worker processes
+
+        The fitness function and config are sent to each worker once, when the pool starts;
+        genomes travel as pack_genome arrays in chunks.  The pool is kept between calls to
+        evaluate, so close the evaluator (or use it as a context manager) when done.
+
+        :param fitness_function: picklable function genome -> fitness
+        :param config: configuration
+        :param num_workers: number of processes, defaults to the number of CPUs
+        :param chunk_size: genomes per task, defaults to about four tasks per worker
+        :param fitness_cache: FitnessCache, only for deterministic fitness functions
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.fitness_function = fitness_function
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.fitness_cache = fitness_cache
+        self.executor = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_worker,
+                                            initargs=(fitness_function, config))
+
+    def evaluate(self, genomes):
+        """
+        Computes the fitness of every genome and stores it in genome.fitness
+
+        :param genomes: list of genomes
+        :return: list of fitness values, in the order of genomes
+        """
+        with reporting.span('evaluation'):
+            if self.fitness_cache is None:
+                fitnesses = self._evaluate(genomes)
+            else:
+                fitnesses = self.fitness_cache.evaluate(genomes, self._evaluate, self.fitness_function)
+        for genome, fitness in zip(genomes, fitnesses):
+            genome.fitness = fitness
+        return fitnesses
+
+    def _evaluate(self, genomes):
+        reporting.count('genomes_evaluated', len(genomes))
+        chunk_size = self.chunk_size or max(1, -(-len(genomes) // (4 * self.num_workers)))
+        futures = [self.executor.submit(_evaluate_payloads, [pack_genome(g) for g in genomes[i:i + chunk_size]])
+                   for i in range(0, len(genomes), chunk_size)]
+        return [fitness for future in futures for fitness in future.result()]
+
+    def close(self):
+        """Shuts the worker processes down"""
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PopulationEvaluator:
+    def __init__(self, genomes, config, *, chunk_size=1024, phenome_cache=None):
+        """
+        PopulationEvaluator - evaluates every genome of a population on the same inputs at once
+
+        The compiled phenomes are laid out in one padded value tensor: bias and inputs first,
+        then a block of columns per topological depth, as wide as the widest layer at that depth,
+        then a constant zero column for outputs that are never evaluated.  Each depth is
+        evaluated for the whole population with a single batched matrix product that writes
+        its block in place.
+
+        :param genomes: list of genomes with the same number of inputs and outputs
+        :param config: configuration
+        :param chunk_size: number of samples evaluated together, bounds the size of the value tensor
+        :param phenome_cache: PhenomeCache of FeedForwardPhenomes to take the phenomes from
+        """
+        if not genomes:
+            raise ValueError("PopulationEvaluator needs at least one genome")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.config = config
+        self.chunk_size = chunk_size
+        with reporting.span('phenome_building'):
+            if phenome_cache is None:
+                self.phenomes = [FeedForwardPhenome(genome, config) for genome in genomes]
+            else:
+                self.phenomes = [phenome_cache.get(genome) for genome in genomes]
+            self.num_inputs = len(self.phenomes[0].input_nodes)
+            self.num_outputs = len(self.phenomes[0].output_nodes)
+            for phenome in self.phenomes:
+                if len(phenome.input_nodes) != self.num_inputs or len(phenome.output_nodes) != self.num_outputs:
+                    raise ValueError("All genomes must have the same number of inputs and outputs")
+
+            self._pack()
+
+    def _pack(self):
+        """Builds the padded layout and one (offset, weights, activation groups) entry per depth"""
+        pop_size = len(self.phenomes)
+        n_depths = max(len(phenome.layers) for phenome in self.phenomes)
+        widths = [max(len(phenome.layers[d]) if d < len(phenome.layers) else 0 for phenome in self.phenomes)
+                  for d in range(n_depths)]
+        offsets = np.cumsum([1 + self.num_inputs] + widths)
+        self.n_columns = int(offsets[-1]) + 1
+        zero_column = self.n_columns - 1
+
+        # Padded column of every dense phenome position
+        columns = []
+        for phenome in self.phenomes:
+            column = np.full(len(phenome.node_order), zero_column, dtype=np.int64)
+            column[:phenome.first_eval] = np.arange(phenome.first_eval)
+            for d in range(len(phenome.layers)):
+                first, last = phenome.layer_ptr[d], phenome.layer_ptr[d + 1]
+                column[phenome.first_eval + first:phenome.first_eval + last] = offsets[d] + np.arange(last - first)
+            columns.append(column)
+
+        self.output_index = np.array([column[phenome.output_index]
+                                      for phenome, column in zip(self.phenomes, columns)])
+        self.depths = []
+        for d, width in enumerate(widths):
+            weights = np.zeros((pop_size, width, offsets[d]))
+            activations = np.full((pop_size, width), -1, dtype=np.int64)
+            for i, (phenome, column) in enumerate(zip(self.phenomes, columns)):
+                if d >= len(phenome.layers):
+                    continue
+                first, last = phenome.layer_ptr[d], phenome.layer_ptr[d + 1]
+                start, stop = phenome.indptr[first], phenome.indptr[last]
+                rows = np.repeat(np.arange(last - first), np.diff(phenome.indptr[first:last + 1]))
+                np.add.at(weights[i], (rows, column[phenome.src[start:stop]]), phenome.weight[start:stop])
+                activations[i, :last - first] = phenome.activation[first:last]
+
+            used = np.unique(activations[activations >= 0])
+            if len(used) == 1:
+                # Padded slots are never read, so they can share the single activation
+                groups = [(activation_functions.get_vectorized(activation_types[used[0]]), None)]
+            else:
+                groups = [(activation_functions.get_vectorized(activation_types[act]), activations == act)
+                          for act in used]
+            self.depths.append((offsets[d], weights, groups))
+
+    def evaluate(self, inputs):
+        """
+        Gives every network's outputs for a dataset
+
+        :param inputs: array of shape (n_samples, num_inputs)
+        :return: array of shape (pop_size, n_samples, num_outputs)
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.ndim != 2 or inputs.shape[1] != self.num_inputs:
+            raise ValueError("Expected array of shape (n_samples, {0}), got {1}".format(self.num_inputs,
+                                                                                      inputs.shape))
+        pop_size, n_samples = len(self.phenomes), inputs.shape[0]
+        outputs = np.empty((pop_size, n_samples, self.num_outputs))
+        with reporting.span('evaluation'):
+            for start in range(0, n_samples, self.chunk_size):
+                chunk = inputs[start:start + self.chunk_size]
+                outputs[:, start:start + len(chunk)] = self._evaluate_chunk(chunk)
+        return outputs
+
+    def _evaluate_chunk(self, inputs):
+        """Evaluates the population on at most chunk_size samples"""
+        pop_size, n_samples = len(self.phenomes), inputs.shape[0]
+        # Node-major layout keeps each genome's block of a depth contiguous
+        values = np.zeros((pop_size, self.n_columns, n_samples))
+        values[:, 0, :] = 1.0
+        values[:, 1:1 + self.num_inputs, :] = inputs.T
+
+        for offset, weights, groups in self.depths:
+            block = values[:, offset:offset + weights.shape[1], :]
+            np.matmul(weights, values[:, :offset, :], out=block)
+            for func, mask in groups:
+                if mask is None:
+                    func(block)
+                else:
+                    block[mask] = func(block[mask])
+
+        outputs = values[np.arange(pop_size)[:, None], self.output_index]
+        return outputs.transpose(0, 2, 1)
+
+
+class AsyncEvaluator:
+    def __init__(self, fitness_function, *, concurrency=16, timeout=None, timeout_fitness=None, fitness_cache=None):
+        """
+        AsyncEvaluator - evaluates genome fitness concurrently on one event loop, for fitness
+        functions that mostly wait on I/O such as a simulator behind a socket
+
+        :param fitness_function: coroutine function genome -> fitness
+        :param concurrency: maximum number of evaluations in flight
+        :param timeout: seconds allowed per genome, or None for no limit
+        :param timeout_fitness: fitness given to genomes that time out; if None a timeout
+                                raises asyncio.TimeoutError
+        :param fitness_cache: FitnessCache, only for deterministic fitness functions; timeout
+                              fitness values are not cached
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+        self.fitness_function = fitness_function
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.timeout_fitness = timeout_fitness
+        self.fitness_cache = fitness_cache
+
+    def evaluate(self, genomes):
+        """
+        Runs evaluate_async on a new event loop
+
+        :param genomes: list of genomes
+        :return: list of fitness values, in the order of genomes
+        """
+        return asyncio.run(self.evaluate_async(genomes))
+
+    async def evaluate_async(self, genomes):
+        """
+        Computes the fitness of every genome and stores it in genome.fitness.  If an evaluation
+        fails, or this coroutine is cancelled, the evaluations still running are cancelled.
+
+        :param genomes: list of genomes
+        :return: list of fitness values, in the order of genomes
+        """
+        with reporting.span('evaluation'):
+            if self.fitness_cache is None:
+                return await self._evaluate(genomes)
+            fitnesses, pending = self.fitness_cache.lookup(genomes, self.fitness_function)
+            evaluated = [genomes[indices[0]] for indices in pending.values()]
+            timed_out = set()
+            new_fitnesses = await self._evaluate(evaluated, timed_out)
+            self.fitness_cache.store(fitnesses, pending, new_fitnesses, uncached=timed_out)
+            for genome, fitness in zip(genomes, fitnesses):
+                genome.fitness = fitness
+            return fitnesses
+
+    async def _evaluate(self, genomes, timed_out=None):
+        """Evaluates genomes concurrently, adding the positions of genomes that time out to timed_out"""
+        reporting.count('genomes_evaluated', len(genomes))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._evaluate_one(genome, semaphore, i, timed_out))
+                 for i, genome in enumerate(genomes)]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _evaluate_one(self, genome, semaphore, position, timed_out):
+        async with semaphore:
+            try:
+                fitness = await asyncio.wait_for(self.fitness_function(genome), self.timeout)
+            except asyncio.TimeoutError:
+                if self.timeout_fitness is None:
+                    raise
+                fitness = self.timeout_fitness
+                if timed_out is not None:
+                    timed_out.add(position)
+        genome.fitness = fitness
+        return fitness
@@ -43,6 +43,7 @@
 
 import numpy.random as random
 
+from neat import innovation
 from neat.activations import activation_types
 
 # Adapted from
@@ -50,23 +51,20 @@ from neat.activations import activation_types
 
 
 class NodeGene:
+    __slots__ = ('idx', 'node_type', 'activation')
 
-    # counter starts at 1 and goes up
-    # TODO find a better way
-    counter = 1
-
-    def __init__(self, *, activation='sigmoid', node_type='HIDDEN', idx=-1):
+    def __init__(self, *, activation='sigmoid', node_type='HIDDEN', idx=-1, registry=None):
         """
         NodeGene - class for nodes in a NEAT network
         Adapted from: https://github.com/CodeReclaimers/neat-python, accessed May 2016
 
         @param activation: node's activation function
         @param node_type: node type, one of 'HIDDEN', 'INPUT', 'OUTPUT'
-        @param idx: node's index
+        @param idx: node's index, by default a new id from registry
+        @param registry: InnovationRegistry, defaults to innovation.default_registry
         """
         if idx == -1:
-            self.idx = NodeGene.counter
-            NodeGene.counter += 1
+            self.idx = (registry or innovation.default_registry).new_node_id()
         elif idx >= 0:
             self.idx = idx
         else:
@@ -81,11 +79,19 @@ class NodeGene:
             self.activation = activation
             assert self.activation in activation_types, "Invalid activation"
 
+    def copy(self):
+        """Copy of the gene, skipping the checks in __init__"""
+        gene = NodeGene.__new__(NodeGene)
+        gene.idx = self.idx
+        gene.node_type = self.node_type
+        gene.activation = self.activation
+        return gene
+
 
 class LinkGene:
-    innovation_counter = 0
+    __slots__ = ('src', 'sink', 'enabled', 'weight', 'innovation_number')
 
-    def __init__(self, src_node, sink_node, *, weight=None, innov=-1, enabled=True):
+    def __init__(self, src_node, sink_node, *, weight=None, innov=-1, enabled=True, registry=None):
         """
         LinkGene - Class for gene for link between nodes
         Adapted from: https://github.com/CodeReclaimers/neat-python, accessed May 2016
@@ -93,8 +99,9 @@ class LinkGene:
         :param src_node: source
         :param sink_node: sink
         :param weight: weight
-        :param innov: innovation number
+        :param innov: innovation number, by default the registry's number for this link
         :param enabled: is link active?
+        :param registry: InnovationRegistry, defaults to innovation.default_registry
         """
         if src_node == sink_node:
             raise ValueError("Links cannot be self-loops")
@@ -108,9 +115,19 @@ class LinkGene:
             self.weight = weight
 
         if innov == -1:
-            self.innovation_number = LinkGene.innovation_counter
-            LinkGene.innovation_counter += 1
+            self.innovation_number = (registry or innovation.default_registry).get_link_innovation(src_node,
+                                                                                                   sink_node)
         elif innov >= 0:
             self.innovation_number = innov
         else:
             raise ValueError("Link gene cannot have negative innovation number")
+
+    def copy(self):
+        """Copy of the gene, skipping the checks in __init__"""
+        gene = LinkGene.__new__(LinkGene)
+        gene.src = self.src
+        gene.sink = self.sink
+        gene.enabled = self.enabled
+        gene.weight = self.weight
+        gene.innovation_number = self.innovation_number
+        return gene
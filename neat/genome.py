@@ -41,21 +41,32 @@
 #   CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 #   SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from operator import attrgetter
+
+import numpy as np
+
+from neat import innovation
+from neat.activations import activation_types
 from neat.config import Config
 from .genes import NodeGene, LinkGene
 
+_innovation = attrgetter('innovation_number')
+
 
 class Genome:
-    def __init__(self, config, *, node_genes=None, link_genes=None):
+    def __init__(self, config, *, node_genes=None, link_genes=None, registry=None):
         """
         Genome for a NEAT network
         Adapted from: https://github.com/CodeReclaimers/neat-python, accessed May 2016
 
+        Link genes are kept sorted by innovation number.
+
         :param config: Configuration
         :param node_genes: list of NodeGenes
         :param link_genes: list of LinkGenes
+        :param registry: InnovationRegistry numbering the links of a random genome,
+                         defaults to innovation.default_registry
         """
-        NodeGene.counter = 1
         self.fitness = 0
         self.link_genes = []
         self.input_genes = []
@@ -71,17 +82,45 @@ class Genome:
             assert self.config.num_inputs == len(self.input_genes)
             assert self.config.num_outputs == len(self.output_genes)
         elif node_genes is None:
-            self._random_genome(config.num_inputs,self.config.num_outputs)
+            self._random_genome(config.num_inputs,self.config.num_outputs, registry)
 
         if link_genes is not None:
             for gene in link_genes:
                 self.link_genes.append(gene)
+        self.link_genes.sort(key=_innovation)
         self.n_links = len(self.link_genes)
+        self._build_indexes()
 
         assert not self._has_duplicate_links()
         assert not self._has_duplicate_node_indices(), "Genome has duplicate node indices"
         self._check_links_have_valid_nodes()
 
+    @classmethod
+    def from_validated(cls, config, node_genes, link_genes, *, fitness=0):
+        """
+        Builds a genome from genes already known to be consistent, skipping all validation.
+        For operators such as crossover and mutation, which preserve the invariants checked
+        by the constructor themselves: the right number of input and output nodes, unique
+        node indices, unique links, and links only between present nodes, never into
+        the bias or an input.
+
+        :param config: Configuration
+        :param node_genes: list of NodeGenes
+        :param link_genes: list of LinkGenes
+        :param fitness: initial fitness
+        """
+        genome = cls.__new__(cls)
+        genome.fitness = fitness
+        genome.config = config
+        genome.input_genes = []
+        genome.hidden_genes = []
+        genome.output_genes = []
+        genome._parse_node_genes(node_genes)
+        genome.link_genes = sorted(link_genes, key=_innovation)
+        genome.n_links = len(genome.link_genes)
+        genome._build_indexes()
+        return genome
+
     # compatibility function
     def distance(self, other):
         """
@@ -91,7 +130,7 @@ class Genome:
         :param other: the other genome
         :return: distance between the genomes
         """
-        if len(self.link_genes) > len(other.link_genes):
+        if self.n_links > other.n_links:
             genome1 = self
             genome2 = other
         else:
@@ -118,33 +157,9 @@ class Genome:
                     self.config.excess_coefficient * float(activation_diff) / most_nodes)
 
         # Compute connection gene differences.
-        if genome1.link_genes:
-            n_genes = len(genome1.link_genes)
-            weight_diff = 0
-            matching = 0
-            disjoint = 0
-            excess = 0
-
-            max_innovation_genome2 = None
-            if genome2.link_genes:
-                max_innovation_genome2 = max([cg.innovation_number for cg in genome2.link_genes])
-
-            for cg1 in genome1.link_genes:
-                cg2 = genome2.get_link_by_indices(cg1.src, cg1.sink)
-                if cg2 is not None:
-                    # Homologous genes
-                    weight_diff += abs(cg1.weight - cg2.weight)
-                    matching += 1
-
-                    if cg1.enabled != cg2.enabled:
-                        weight_diff += 1.0
-                else:
-                    if max_innovation_genome2 is not None and cg1.innovation_number > max_innovation_genome2:
-                        excess += 1
-                    else:
-                        disjoint += 1
-
-            disjoint += len(genome2.link_genes) - matching
+        if genome1.n_links:
+            n_genes = genome1.n_links
+            matching, weight_diff, disjoint, excess = genome1._compare_links(genome2)
 
             distance += self.config.excess_coefficient * float(excess) / n_genes
             distance += self.config.disjoint_coefficient * float(disjoint) / n_genes
@@ -153,6 +168,40 @@ class Genome:
 
         return distance
 
+    def _compare_links(self, other):
+        """
+        Link gene comparison for distance, from the genome with at least as many links
+
+        :return: (matching, weight_diff, disjoint, excess), where weight_diff sums the weight
+                 differences of matching links plus 1 for each differing enabled flag
+        """
+        weight_diff = 0
+        matching = 0
+        disjoint = 0
+        excess = 0
+
+        max_innovation_other = None
+        if other.n_links:
+            max_innovation_other = other.link_genes[-1].innovation_number
+
+        for cg1 in self.link_genes:
+            cg2 = other.get_link_by_indices(cg1.src, cg1.sink)
+            if cg2 is not None:
+                # Homologous genes
+                weight_diff += abs(cg1.weight - cg2.weight)
+                matching += 1
+
+                if cg1.enabled != cg2.enabled:
+                    weight_diff += 1.0
+            else:
+                if max_innovation_other is not None and cg1.innovation_number > max_innovation_other:
+                    excess += 1
+                else:
+                    disjoint += 1
+
+        disjoint += other.n_links - matching
+        return matching, weight_diff, disjoint, excess
+
     def size(self):
         """
         Complexity size: (n_hidden_nodes, enabled_links)
@@ -168,35 +217,76 @@ class Genome:
 
     def get_link_by_indices(self, src, sink):
         """Returns a link gene from src to sink if it is in genome, else None"""
-        for link in self.link_genes:
-            if link.src == src and link.sink == sink:
-                return link
-        return None
+        return self._link_index.get((src, sink))
 
     def get_node_by_index(self, idx):
         """Returns a node with index idx if it is in genome, else None"""
         assert idx > 0
-        for node in self.input_genes:
-            if node.idx == idx:
-                return node
-        for node in self.hidden_genes:
-            if node.idx == idx:
-                return node
-        for node in self.output_genes:
-            if node.idx == idx:
-                return node
-        return None
+        return self._node_index.get(idx)
+
+    def add_node_gene(self, gene):
+        """Adds a node gene to the genome"""
+        if gene.idx in self._node_index or gene.idx == 0:
+            raise ValueError("Genome already has a node with index %i" % gene.idx)
+        self._parse_node_genes([gene])
+        self._node_index[gene.idx] = gene
+
+    def add_link_gene(self, gene):
+        """Adds a link gene to the genome"""
+        if (gene.src, gene.sink) in self._link_index:
+            raise ValueError("Genome already has a link from %i to %i" % (gene.src, gene.sink))
+        if gene.src != 0 and gene.src not in self._node_index:
+            raise ValueError("Link connecting to missing node")
+        sink = self._node_index.get(gene.sink)
+        if sink is None:
+            raise ValueError("Link connecting to missing node")
+        if sink.node_type == 'INPUT':
+            raise ValueError("Link sink is an input")
+        self.link_genes.append(gene)
+        if len(self.link_genes) > 1 and gene.innovation_number < self.link_genes[-2].innovation_number:
+            self.link_genes.sort(key=_innovation)
+        self._link_index[(gene.src, gene.sink)] = gene
+        self.n_links += 1
+
+    def remove_link_gene(self, src, sink):
+        """Removes the link gene from src to sink, returns it"""
+        gene = self._link_index.pop((src, sink), None)
+        if gene is None:
+            raise ValueError("Genome has no link from %i to %i" % (src, sink))
+        self.link_genes.remove(gene)
+        self.n_links -= 1
+        return gene
+
+    def remove_node_gene(self, idx):
+        """Removes a hidden node gene and every link to or from it, returns the node"""
+        gene = self._node_index.get(idx)
+        if gene is None or gene.node_type != 'HIDDEN':
+            raise ValueError("Genome has no hidden node with index %i" % idx)
+        del self._node_index[idx]
+        self.hidden_genes.remove(gene)
+        self.link_genes = [link for link in self.link_genes if link.src != idx and link.sink != idx]
+        self._link_index = {(link.src, link.sink): link for link in self.link_genes}
+        self.n_links = len(self.link_genes)
+        return gene
 
-    def _random_genome(self, n_inputs, n_outputs):
-        """Creates random, fully-connected genome with n_in and n_out"""
+    def _build_indexes(self):
+        """Builds the index -> NodeGene and (src, sink) -> LinkGene lookup tables"""
+        self._node_index = {gene.idx: gene for gene in self.node_genes()}
+        self._link_index = {(gene.src, gene.sink): gene for gene in self.link_genes}
+
+    def _random_genome(self, n_inputs, n_outputs, registry=None):
+        """Creates random, fully-connected genome with inputs 1..n_in and outputs n_in + 1..n_in + n_out"""
+        registry = registry or innovation.default_registry
+        registry.reserve_nodes(n_inputs + n_outputs)
         for i in range(n_inputs):
-            self.input_genes.append(NodeGene(node_type='INPUT'))
+            self.input_genes.append(NodeGene(node_type='INPUT', idx=i + 1))
         for i in range(n_outputs):
-            self.output_genes.append(NodeGene(node_type='OUTPUT'))
+            self.output_genes.append(NodeGene(node_type='OUTPUT', idx=n_inputs + i + 1))
+        weights = iter(np.random.random(n_outputs * (n_inputs + 1)).tolist())
         for sink in self.output_genes:
-            self.link_genes.append(LinkGene(0, sink.idx))
+            self.link_genes.append(LinkGene(0, sink.idx, weight=next(weights), registry=registry))
             for src in self.input_genes:
-                self.link_genes.append(LinkGene(src.idx, sink.idx))
+                self.link_genes.append(LinkGene(src.idx, sink.idx, weight=next(weights), registry=registry))
 
     def _parse_node_genes(self, node_genes):
         """Reads node genes into genome"""
@@ -212,45 +302,27 @@ class Genome:
 
     def _has_duplicate_node_indices(self):
         """Tests if a node is present twice"""
-        node_genes = self.input_genes + self.hidden_genes + self.output_genes
-        for i in range(len(node_genes)):
-            for j in range(i + 1, len(node_genes)):
-                if node_genes[i].idx == node_genes[j].idx:
-                    return True
-        return False
+        return len(self._node_index) != len(self.input_genes) + len(self.hidden_genes) + len(self.output_genes)
 
     def _has_duplicate_links(self):
-        """Tests is a link is present twice"""
-        links = [(a.src, a.sink) for a in self.link_genes]
-        for i in range(len(links)):
-            isrc, isnk = links[i]
-            for j in range(i + 1, len(links)):
-                jsrc, jsnk = links[j]
-                if isrc == jsrc and isnk == jsnk:
-                    return True
-                elif isrc == jsnk and isnk == jsrc:
-                    return True
-                return False
+        """Tests if a link is present twice"""
+        return len(self._link_index) != len(self.link_genes)
 
     def _check_links_have_valid_nodes(self):
         """
         Checks if any links go to nodes which are not present, and
         ensures bias/inputs are never sinks
         """
-        input_indices = [g.idx for g in self.input_genes]
-        output_indices = [g.idx for g in self.output_genes]
-        hidden_indices = [g.idx for g in self.hidden_genes]
-        node_indices = [0] + input_indices + output_indices + hidden_indices
-
         for gene in self.link_genes:
-            if gene.src not in node_indices:
+            if gene.src != 0 and gene.src not in self._node_index:
                 raise ValueError("Link connecting to missing node")
-            if gene.sink not in node_indices:
+            if gene.sink == 0:
+                raise ValueError("Link sink is bias")
+            sink = self._node_index.get(gene.sink)
+            if sink is None:
                 raise ValueError("Link connecting to missing node")
-            if gene.sink in input_indices:
+            if sink.node_type == 'INPUT':
                 raise ValueError("Link sink is an input")
-            elif gene.sink == 0:
-                raise ValueError("Link sink is bias")
 
     @staticmethod
     def _check_args(n_inputs, n_outputs, node_genes, link_genes):
@@ -266,3 +338,335 @@ class Genome:
         if n_outputs is not None:
             if n_outputs < 1:
                 raise ValueError("Genome needs positive number of outputs")
+
+
+class LinkView:
+    __slots__ = ('_genome', '_row')
+
+    def __init__(self, genome, row):
+        """
+        LinkView - LinkGene interface to one row of an ArrayGenome's link arrays.
+        Valid until links are added to or removed from the genome.
+
+        :param genome: ArrayGenome
+        :param row: row in the link arrays
+        """
+        self._genome = genome
+        self._row = row
+
+    @property
+    def src(self):
+        return int(self._genome.link_src[self._row])
+
+    @property
+    def sink(self):
+        return int(self._genome.link_sink[self._row])
+
+    @property
+    def innovation_number(self):
+        return int(self._genome.link_innovation[self._row])
+
+    @property
+    def weight(self):
+        return float(self._genome.link_weight[self._row])
+
+    @weight.setter
+    def weight(self, value):
+        self._genome.link_weight[self._row] = value
+
+    @property
+    def enabled(self):
+        return bool(self._genome.link_enabled[self._row])
+
+    @enabled.setter
+    def enabled(self, value):
+        self._genome.link_enabled[self._row] = value
+
+    def copy(self):
+        """LinkGene with the fields of this row"""
+        return LinkGene(self.src, self.sink, weight=self.weight, innov=self.innovation_number, enabled=self.enabled)
+
+
+class ArrayGenome(Genome):
+    def __init__(self, config, *, node_genes=None, link_genes=None, registry=None):
+        """
+        Genome storing its links as parallel arrays, link_src, link_sink, link_weight,
+        link_enabled and link_innovation, sorted by innovation number.  About 33 bytes per
+        link instead of a LinkGene object, its numbers and its index entry.
+
+        link_genes and get_link_by_indices return LinkView objects, which read and
+        write the arrays, so code written against Genome works unchanged.
+
+        :param config: Configuration
+        :param node_genes: list of NodeGenes
+        :param link_genes: list of LinkGenes
+        :param registry: InnovationRegistry numbering the links of a random genome
+        """
+        genome = Genome(config, node_genes=node_genes, link_genes=link_genes, registry=registry)
+        self._set_links_from(genome)
+
+    @classmethod
+    def from_genome(cls, genome):
+        """ArrayGenome with the genes of genome, sharing its node genes"""
+        array_genome = cls.__new__(cls)
+        array_genome._set_links_from(genome)
+        return array_genome
+
+    @classmethod
+    def from_validated(cls, config, node_genes, link_genes, *, fitness=0):
+        """See Genome.from_validated"""
+        return cls.from_genome(Genome.from_validated(config, node_genes, link_genes, fitness=fitness))
+
+    @classmethod
+    def from_arrays(cls, config, node_genes, src, sink, weight, enabled, innovation, *, fitness=0, copy=True):
+        """
+        Builds a genome from node genes and link arrays, skipping validation like
+        Genome.from_validated.  The arrays are copied and sorted by innovation number.
+
+        With copy=False the arrays are used as they are: they must have the right dtypes
+        and be sorted by innovation number.  The genome only ever writes to link_weight and
+        link_enabled in place, so the other three may be shared between genomes.
+
+        :param config: Configuration
+        :param node_genes: list of NodeGenes
+        :param src: link sources
+        :param sink: link sinks
+        :param weight: link weights
+        :param enabled: link enabled flags
+        :param innovation: link innovation numbers
+        :param fitness: initial fitness
+        :param copy: copy and sort the arrays
+        """
+        genome = cls.__new__(cls)
+        genome.fitness = fitness
+        genome.config = config
+        genome.input_genes = []
+        genome.hidden_genes = []
+        genome.output_genes = []
+        genome._parse_node_genes(node_genes)
+        if not copy:
+            genome.link_src, genome.link_sink, genome.link_innovation = src, sink, innovation
+            genome.link_weight, genome.link_enabled = weight, enabled
+            genome._build_indexes()
+            return genome
+        innovation = np.asarray(innovation, dtype=np.int64)
+        order = np.argsort(innovation, kind='stable')
+        genome.link_src = np.asarray(src, dtype=np.int64)[order]
+        genome.link_sink = np.asarray(sink, dtype=np.int64)[order]
+        genome.link_weight = np.asarray(weight, dtype=float)[order]
+        genome.link_enabled = np.asarray(enabled, dtype=bool)[order]
+        genome.link_innovation = innovation[order]
+        genome._build_indexes()
+        return genome
+
+    def _set_links_from(self, genome):
+        """Takes the nodes and fitness of genome and copies its links into arrays"""
+        links = genome.link_genes
+        self.fitness = genome.fitness
+        self.config = genome.config
+        self.input_genes = list(genome.input_genes)
+        self.hidden_genes = list(genome.hidden_genes)
+        self.output_genes = list(genome.output_genes)
+        self.link_src = np.array([g.src for g in links], dtype=np.int64)
+        self.link_sink = np.array([g.sink for g in links], dtype=np.int64)
+        self.link_weight = np.array([g.weight for g in links], dtype=float)
+        self.link_enabled = np.array([g.enabled for g in links], dtype=bool)
+        self.link_innovation = np.array([g.innovation_number for g in links], dtype=np.int64)
+        self._build_indexes()
+
+    def to_genome(self):
+        """Genome with LinkGene objects holding the same genes"""
+        return Genome.from_validated(self.config, self.node_genes(), [
+            LinkGene(src, sink, weight=weight, enabled=enabled, innov=innovation)
+            for src, sink, weight, enabled, innovation in zip(
+                self.link_src.tolist(), self.link_sink.tolist(), self.link_weight.tolist(),
+                self.link_enabled.tolist(), self.link_innovation.tolist())])
+
+    @property
+    def link_genes(self):
+        """List of LinkViews, in innovation order"""
+        return [LinkView(self, row) for row in range(len(self.link_innovation))]
+
+    @property
+    def n_links(self):
+        return len(self.link_innovation)
+
+    def size(self):
+        """Complexity size: (n_hidden_nodes, enabled_links)"""
+        return len(self.hidden_genes), int(np.count_nonzero(self.link_enabled))
+
+    def _compare_links(self, other):
+        """Link gene comparison for distance, on the arrays when other is an ArrayGenome too"""
+        if not isinstance(other, ArrayGenome):
+            return super()._compare_links(other)
+        _, rows, other_rows = np.intersect1d((self.link_src << 32) | self.link_sink,
+                                             (other.link_src << 32) | other.link_sink,
+                                             assume_unique=True, return_indices=True)
+        matching = len(rows)
+        weight_diff = float(np.abs(self.link_weight[rows] - other.link_weight[other_rows]).sum() +
+                            np.count_nonzero(self.link_enabled[rows] != other.link_enabled[other_rows]))
+        unmatched = np.ones(self.n_links, dtype=bool)
+        unmatched[rows] = False
+        if other.n_links:
+            excess = int(np.count_nonzero(self.link_innovation[unmatched] > other.link_innovation[-1]))
+        else:
+            excess = 0
+        disjoint = self.n_links - matching - excess + other.n_links - matching
+        return matching, weight_diff, disjoint, excess
+
+    def get_link_by_indices(self, src, sink):
+        """Returns a LinkView of the link from src to sink if it is in genome, else None"""
+        row = self._find_link(src, sink)
+        return None if row is None else LinkView(self, row)
+
+    def add_link_gene(self, gene):
+        """Adds a link gene to the genome, copying its fields"""
+        if self._find_link(gene.src, gene.sink) is not None:
+            raise ValueError("Genome already has a link from %i to %i" % (gene.src, gene.sink))
+        if gene.src != 0 and gene.src not in self._node_index:
+            raise ValueError("Link connecting to missing node")
+        sink = self._node_index.get(gene.sink)
+        if sink is None:
+            raise ValueError("Link connecting to missing node")
+        if sink.node_type == 'INPUT':
+            raise ValueError("Link sink is an input")
+        row = np.searchsorted(self.link_innovation, gene.innovation_number, side='right')
+        self.link_src = np.insert(self.link_src, row, gene.src)
+        self.link_sink = np.insert(self.link_sink, row, gene.sink)
+        self.link_weight = np.insert(self.link_weight, row, gene.weight)
+        self.link_enabled = np.insert(self.link_enabled, row, gene.enabled)
+        self.link_innovation = np.insert(self.link_innovation, row, gene.innovation_number)
+        self._link_keys = None
+
+    def remove_link_gene(self, src, sink):
+        """Removes the link gene from src to sink, returns it as a LinkGene"""
+        row = self._find_link(src, sink)
+        if row is None:
+            raise ValueError("Genome has no link from %i to %i" % (src, sink))
+        gene = LinkGene(src, sink, weight=float(self.link_weight[row]), enabled=bool(self.link_enabled[row]),
+                        innov=int(self.link_innovation[row]))
+        keep = np.ones(self.n_links, dtype=bool)
+        keep[row] = False
+        self._keep_links(keep)
+        return gene
+
+    def remove_node_gene(self, idx):
+        """Removes a hidden node gene and every link to or from it, returns the node"""
+        gene = self._node_index.get(idx)
+        if gene is None or gene.node_type != 'HIDDEN':
+            raise ValueError("Genome has no hidden node with index %i" % idx)
+        del self._node_index[idx]
+        self.hidden_genes.remove(gene)
+        self._keep_links((self.link_src != idx) & (self.link_sink != idx))
+        return gene
+
+    def _keep_links(self, keep):
+        """Drops the links where the boolean mask keep is False"""
+        self.link_src = self.link_src[keep]
+        self.link_sink = self.link_sink[keep]
+        self.link_weight = self.link_weight[keep]
+        self.link_enabled = self.link_enabled[keep]
+        self.link_innovation = self.link_innovation[keep]
+        self._link_keys = None
+
+    def _find_link(self, src, sink):
+        """Row of the link from src to sink, or None"""
+        if self._link_keys is None:
+            keys = (self.link_src << 32) | self.link_sink
+            self._link_rows = np.argsort(keys)
+            self._link_keys = keys[self._link_rows]
+        key = (src << 32) | sink
+        pos = np.searchsorted(self._link_keys, key)
+        if pos < len(self._link_keys) and self._link_keys[pos] == key:
+            return int(self._link_rows[pos])
+        return None
+
+    def _build_indexes(self):
+        """Builds the index -> NodeGene table; the link lookup table is sorted on first use"""
+        self._node_index = {gene.idx: gene for gene in self.node_genes()}
+        self._link_keys = None
+        self._link_rows = None
+
+    def _has_duplicate_links(self):
+        """Tests if a link is present twice"""
+        return len(np.unique((self.link_src << 32) | self.link_sink)) != self.n_links
+
+
+def distance_matrix(genomes, config=None):
+    """
+    All pairwise Genome.distance values of a population, computed with array operations.
+    Genes are laid out as presence/value matrices with one column per node index and per
+    (src, sink) link; entry [i, j] equals genomes[i].distance(genomes[j]).
+
+    :param genomes: list of genomes
+    :param config: Configuration holding the coefficients, defaults to the first genome's
+    :return: (len(genomes), len(genomes)) array
+    """
+    if config is None:
+        config = genomes[0].config
+    n = len(genomes)
+    if n == 0:
+        return np.zeros((0, 0))
+
+    # Node genes
+    node_columns = {}
+    for genome in genomes:
+        for gene in genome.node_genes():
+            node_columns.setdefault(gene.idx, len(node_columns))
+    activation_ids = {name: i for i, name in enumerate(activation_types)}
+    node_activation = np.full((n, len(node_columns)), -1, dtype=np.int64)
+    for i, genome in enumerate(genomes):
+        for gene in genome.node_genes():
+            node_activation[i, node_columns[gene.idx]] = activation_ids[gene.activation]
+    node_present = (node_activation >= 0).astype(float)
+    node_count = node_present.sum(axis=1)
+    common_nodes = node_present @ node_present.T
+    same_activation = np.zeros((n, n))
+    for act in np.unique(node_activation[node_activation >= 0]):
+        has_act = (node_activation == act).astype(float)
+        same_activation += has_act @ has_act.T
+    node_diff = (node_count[:, None] + node_count[None, :] - 2 * common_nodes) + (common_nodes - same_activation)
+    distance = config.excess_coefficient * node_diff / np.maximum(node_count[:, None], node_count[None, :])
+
+    # Link genes
+    link_columns = {}
+    for genome in genomes:
+        for gene in genome.link_genes:
+            link_columns.setdefault((gene.src, gene.sink), len(link_columns))
+    present = np.zeros((n, len(link_columns)), dtype=bool)
+    weight = np.zeros((n, len(link_columns)))
+    enabled = np.zeros((n, len(link_columns)), dtype=bool)
+    innovation = np.zeros((n, len(link_columns)))
+    max_innovation = np.full(n, np.inf)
+    for i, genome in enumerate(genomes):
+        if genome.link_genes:
+            max_innovation[i] = genome.link_genes[-1].innovation_number
+        for gene in genome.link_genes:
+            k = link_columns[(gene.src, gene.sink)]
+            present[i, k] = True
+            weight[i, k] = gene.weight
+            enabled[i, k] = gene.enabled
+            innovation[i, k] = gene.innovation_number
+
+    link_count = present.sum(axis=1).astype(float)
+    matching = present.astype(float) @ present.T.astype(float)
+    weight_diff = np.empty((n, n))
+    # excess[i, j]: genes of i missing from j with an innovation past j's newest gene
+    excess = np.empty((n, n))
+    for i in range(n):
+        both = present[i] & present
+        weight_diff[i] = ((np.abs(weight[i] - weight) + (enabled[i] != enabled)) * both).sum(axis=1)
+        excess[i] = ((present[i] & ~present) & (innovation[i] > max_innovation[:, None])).sum(axis=1)
+
+    # Genome.distance compares from the genome with more links, the other one on ties
+    i_first = link_count[:, None] > link_count[None, :]
+    n1 = np.where(i_first, link_count[:, None], link_count[None, :])
+    n2 = np.where(i_first, link_count[None, :], link_count[:, None])
+    excess = np.where(i_first, excess, excess.T)
+    disjoint = (n1 - matching - excess) + (n2 - matching)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        link_distance = (config.excess_coefficient * excess / n1 +
+                         config.disjoint_coefficient * disjoint / n1 +
+                         np.where(matching > 0, config.weight_coefficient * weight_diff / matching, 0.0))
+    distance += np.where(n1 > 0, link_distance, 0.0)
+    return distance
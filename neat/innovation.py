@@ -0,0 +1,158 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+
+
+class InnovationRegistry:
+    def __init__(self, *, next_node_id=1, next_innovation=0):
+        """
+        InnovationRegistry - hands out node ids and link innovation numbers for one run
+
+        Within a generation the same structural mutation gets the same number: every link
+        from src to sink created this generation shares one innovation number, and every
+        split of the link src -> sink shares one new node id.  This keeps genomes that mutate
+        independently aligned, so crossover and distance find them homologous.
+
+        Worker processes reproduce with a fork() of the registry and send it back with
+        their offspring; merge() numbers the worker's new genes in the run's registry and
+        returns the renumbering, which remap_genome applies to the offspring.
+
+        :param next_node_id: first node id to hand out
+        :param next_innovation: first innovation number to hand out
+        """
+        if next_node_id < 1 or next_innovation < 0:
+            raise ValueError("Node ids start at 1 and innovation numbers at 0")
+        self.next_node_id = next_node_id
+        self.next_innovation = next_innovation
+        self.generation = 0
+        self._link_innovations = {}
+        self._node_splits = {}
+        # (kind, key, id) of every number handed out since fork(), for merge()
+        self._log = None
+
+    @classmethod
+    def from_genomes(cls, genomes):
+        """Registry handing out numbers above every node id and innovation in genomes, e.g. after loading them"""
+        registry = cls()
+        for genome in genomes:
+            registry.reserve_nodes(max(gene.idx for gene in genome.node_genes()))
+            for gene in genome.link_genes:
+                registry.next_innovation = max(registry.next_innovation, gene.innovation_number + 1)
+        return registry
+
+    def new_node_id(self):
+        """A fresh node id"""
+        idx = self.next_node_id
+        self.next_node_id += 1
+        if self._log is not None:
+            self._log.append(('node', None, idx))
+        return idx
+
+    def reserve_nodes(self, last_idx):
+        """Makes sure node ids handed out from now on are above last_idx"""
+        self.next_node_id = max(self.next_node_id, last_idx + 1)
+        if self._log is not None:
+            self._log.append(('reserve', None, last_idx))
+
+    def get_split_node_id(self, src, sink):
+        """Id of the node inserted when splitting the link from src to sink, shared within a generation"""
+        idx = self._node_splits.get((src, sink))
+        if idx is None:
+            idx = self.next_node_id
+            self.next_node_id += 1
+            self._node_splits[(src, sink)] = idx
+            if self._log is not None:
+                self._log.append(('node', (src, sink), idx))
+        return idx
+
+    def get_link_innovation(self, src, sink):
+        """Innovation number of a link from src to sink, shared within a generation"""
+        innovation = self._link_innovations.get((src, sink))
+        if innovation is None:
+            innovation = self.next_innovation
+            self.next_innovation += 1
+            self._link_innovations[(src, sink)] = innovation
+            if self._log is not None:
+                self._log.append(('link', (src, sink), innovation))
+        return innovation
+
+    def new_generation(self):
+        """Starts a new generation: structural mutations from now on get new numbers"""
+        self.generation += 1
+        self._link_innovations.clear()
+        self._node_splits.clear()
+
+    def fork(self):
+        """Copy of the registry for a worker process, which records the numbers it hands out"""
+        worker = copy.copy(self)
+        worker._link_innovations = dict(self._link_innovations)
+        worker._node_splits = dict(self._node_splits)
+        worker._log = []
+        return worker
+
+    def merge(self, worker):
+        """
+        Hands out the numbers a forked registry gave to new genes, reusing the numbers of
+        structural mutations already seen this generation.  Merge workers in a fixed order
+        for reproducible numbering.
+
+        :param worker: registry returned by fork(), after use
+        :return: (node_map, innovation_map), dicts from the worker's numbers to the run's
+        """
+        if worker._log is None:
+            raise ValueError("Can only merge a registry made by fork()")
+        if worker.generation != self.generation:
+            raise ValueError("Cannot merge a registry from generation %i into generation %i" %
+                             (worker.generation, self.generation))
+        node_map = {}
+        innovation_map = {}
+        for kind, key, number in worker._log:
+            if key is not None:
+                key = (node_map.get(key[0], key[0]), node_map.get(key[1], key[1]))
+            if kind == 'reserve':
+                self.reserve_nodes(number)
+            elif kind == 'link':
+                innovation_map[number] = self.get_link_innovation(*key)
+            elif key is None:
+                node_map[number] = self.new_node_id()
+            else:
+                node_map[number] = self.get_split_node_id(*key)
+        return node_map, innovation_map
+
+
+def remap_genome(genome, node_map, innovation_map):
+    """
+    Copy of genome with node ids and innovation numbers renumbered, see InnovationRegistry.merge
+
+    :param genome: genome built with a forked registry
+    :param node_map: dict old node id -> new node id, ids not in it are kept
+    :param innovation_map: dict old innovation -> new innovation, numbers not in it are kept
+    :return: genome of the same class
+    """
+    from neat.genes import LinkGene, NodeGene
+
+    node_genes = [NodeGene(idx=node_map.get(gene.idx, gene.idx), node_type=gene.node_type,
+                           activation=gene.activation) for gene in genome.node_genes()]
+    link_genes = []
+    for gene in genome.link_genes:
+        link_genes.append(LinkGene(node_map.get(gene.src, gene.src), node_map.get(gene.sink, gene.sink),
+                                   weight=gene.weight, enabled=gene.enabled,
+                                   innov=innovation_map.get(gene.innovation_number, gene.innovation_number)))
+    return type(genome).from_validated(genome.config, node_genes, link_genes, fitness=genome.fitness)
+
+
+# Numbers for genes created without a registry, such as in scripts and tests; runs use their own
+default_registry = InnovationRegistry()
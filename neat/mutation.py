@@ -0,0 +1,207 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from neat import reporting
+from neat.genes import NodeGene, LinkGene
+
+
+def _rng(rng):
+    return np.random if rng is None else rng
+
+
+def _is_array_backed(genome):
+    return hasattr(genome, 'link_weight')
+
+
+def mutate_weights(genomes, config, rng=None):
+    """
+    Weight and toggle mutation for a whole population at once.  Each link's weight is
+    perturbed by N(0, weight_mutation_power) with probability prob_mutate_weight, and each
+    link is enabled/disabled with probability prob_toggle_link.  The random numbers for
+    all links of all genomes come from three NumPy calls.
+
+    ArrayGenomes are updated in their link arrays; other genomes gene by gene.
+
+    :param genomes: list of genomes, changed in place
+    :param config: configuration
+    :param rng: numpy Generator or RandomState, defaults to numpy.random
+    """
+    if not genomes:
+        return
+    rng = _rng(rng)
+    links = [None if _is_array_backed(genome) else genome.link_genes for genome in genomes]
+    weight_parts = []
+    enabled_parts = []
+    for genome, genome_links in zip(genomes, links):
+        if genome_links is None:
+            weight_parts.append(genome.link_weight)
+            enabled_parts.append(genome.link_enabled)
+        else:
+            weight_parts.append(np.array([gene.weight for gene in genome_links], dtype=float))
+            enabled_parts.append(np.array([gene.enabled for gene in genome_links], dtype=bool))
+    weights = np.concatenate(weight_parts)
+    enabled = np.concatenate(enabled_parts)
+
+    perturbed = rng.random(len(weights)) < config.prob_mutate_weight
+    weights[perturbed] += rng.normal(0.0, config.weight_mutation_power, int(np.count_nonzero(perturbed)))
+    enabled ^= rng.random(len(enabled)) < config.prob_toggle_link
+
+    start = 0
+    for genome, genome_links in zip(genomes, links):
+        stop = start + genome.n_links
+        if genome_links is None:
+            genome.link_weight[:] = weights[start:stop]
+            genome.link_enabled[:] = enabled[start:stop]
+        else:
+            for gene, weight, is_enabled in zip(genome_links, weights[start:stop].tolist(),
+                                                enabled[start:stop].tolist()):
+                gene.weight = weight
+                gene.enabled = is_enabled
+        start = stop
+
+
+def creates_cycle(genome, src, sink):
+    """Tests if adding a link from src to sink would close a cycle of links"""
+    if src == sink:
+        return True
+    successors = {}
+    for gene in genome.link_genes:
+        successors.setdefault(gene.src, []).append(gene.sink)
+    visited = {sink}
+    stack = [sink]
+    while stack:
+        for node in successors.get(stack.pop(), ()):
+            if node == src:
+                return True
+            if node not in visited:
+                visited.add(node)
+                stack.append(node)
+    return False
+
+
+def mutate_add_link(genome, registry, rng=None, *, feed_forward=True, attempts=20):
+    """
+    Adds a link between two unconnected nodes, with a uniform random weight
+
+    :param genome: genome, changed in place
+    :param registry: InnovationRegistry numbering the new link
+    :param rng: numpy Generator or RandomState, defaults to numpy.random
+    :param feed_forward: never close a cycle
+    :param attempts: random node pairs tried before giving up
+    :return: the new LinkGene, or None if no pair was found
+    """
+    rng = _rng(rng)
+    sources = [0] + [gene.idx for gene in genome.node_genes()]
+    sinks = [gene.idx for gene in genome.hidden_genes + genome.output_genes]
+    for _ in range(attempts):
+        src = sources[rng.choice(len(sources))]
+        sink = sinks[rng.choice(len(sinks))]
+        if src == sink or genome.get_link_by_indices(src, sink) is not None:
+            continue
+        if feed_forward and creates_cycle(genome, src, sink):
+            continue
+        gene = LinkGene(src, sink, weight=float(rng.random()), registry=registry)
+        genome.add_link_gene(gene)
+        return gene
+    return None
+
+
+def mutate_add_node(genome, config, registry, rng=None):
+    """
+    Splits a random enabled link src -> sink with a new hidden node: the link is disabled
+    and replaced by src -> node with weight 1 and node -> sink with the old weight
+
+    :param genome: genome, changed in place
+    :param config: configuration, gives the activation functions to choose from
+    :param registry: InnovationRegistry numbering the new node and links
+    :param rng: numpy Generator or RandomState, defaults to numpy.random
+    :return: the new NodeGene, or None if the genome has no enabled link to split
+    """
+    rng = _rng(rng)
+    enabled = [gene for gene in genome.link_genes if gene.enabled]
+    if not enabled:
+        return None
+    link = enabled[rng.choice(len(enabled))]
+    src, sink, weight = link.src, link.sink, link.weight
+    idx = registry.get_split_node_id(src, sink)
+    if genome.get_node_by_index(idx) is not None:
+        return None
+    activation = config.activation_functions[rng.choice(len(config.activation_functions))]
+    node = NodeGene(node_type='HIDDEN', activation=activation, idx=idx)
+    link.enabled = False
+    genome.add_node_gene(node)
+    genome.add_link_gene(LinkGene(src, idx, weight=1.0, registry=registry))
+    genome.add_link_gene(LinkGene(idx, sink, weight=weight, registry=registry))
+    return node
+
+
+def mutate_delete_link(genome, rng=None):
+    """Removes a random link, returns it or None if the genome has no links"""
+    rng = _rng(rng)
+    if genome.n_links == 0:
+        return None
+    link = genome.link_genes[rng.choice(genome.n_links)]
+    return genome.remove_link_gene(link.src, link.sink)
+
+
+def mutate_delete_node(genome, rng=None):
+    """Removes a random hidden node with its links, returns it or None if the genome has no hidden nodes"""
+    rng = _rng(rng)
+    if not genome.hidden_genes:
+        return None
+    node = genome.hidden_genes[rng.choice(len(genome.hidden_genes))]
+    return genome.remove_node_gene(node.idx)
+
+
+def mutate_structure(genome, config, registry, rng=None):
+    """
+    Structural mutation of one genome: adds or deletes a node or a link with the
+    probabilities from config.  With multiple_mutations, each mutation is tried
+    independently; otherwise at most one happens.
+
+    :param genome: genome, changed in place
+    :param config: configuration
+    :param registry: InnovationRegistry numbering new genes
+    :param rng: numpy Generator or RandomState, defaults to numpy.random
+    """
+    rng = _rng(rng)
+    mutations = [(config.prob_add_node, lambda: mutate_add_node(genome, config, registry, rng)),
+                 (config.prob_add_conn, lambda: mutate_add_link(genome, registry, rng)),
+                 (config.prob_delete_node, lambda: mutate_delete_node(genome, rng)),
+                 (config.prob_delete_conn, lambda: mutate_delete_link(genome, rng))]
+    draws = rng.random(len(mutations))
+    for draw, (probability, mutation) in zip(draws, mutations):
+        if draw < probability:
+            mutation()
+            if not config.multiple_mutations:
+                break
+
+
+def mutate_population(genomes, config, registry, rng=None):
+    """
+    Mutates every genome: structural mutations genome by genome, then weight and toggle
+    mutations for the whole population with mutate_weights
+
+    :param genomes: list of genomes, changed in place
+    :param config: configuration
+    :param registry: InnovationRegistry numbering new genes
+    :param rng: numpy Generator or RandomState, defaults to numpy.random
+    """
+    with reporting.span('mutation'):
+        for genome in genomes:
+            mutate_structure(genome, config, registry, rng)
+        mutate_weights(genomes, config, rng)
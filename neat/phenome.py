@@ -42,43 +42,68 @@
 #   SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import time
-import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
 
-from neat import activation_functions
+from neat import activation_functions, reporting
+from neat.activations import activation_types
 
 
-def find_feed_forward_layers(inputs, connections):
+def find_feed_forward_layers(inputs, connections, outputs=None):
     """
     Collect the layers whose members can be evaluated in parallel in a feed-forward network.
     Adapted from: https://github.com/CodeReclaimers/neat-python, accessed May 2016
 
+    Layers are peeled off in O(V + E) with Kahn's algorithm: a node joins the layer after
+    the one holding its last source.  Nodes on cycles, or fed by nodes that are never
+    evaluated, are left out.
+
     :param inputs: list of the network input nodes
     :param connections: list of (input, output) connections in the network.
+    :param outputs: list of the network output nodes; if given, nodes that never feed
+                    an output are omitted
     Returns a list of layers, with each layer consisting of a set of node identifiers.
 
     """
-
-    # TODO: Detect and omit nodes whose output is ultimately never used.
+    start_nodes = set(inputs)
+    start_nodes.add(0)
+
+    if outputs is not None:
+        sources_of = {}
+        for a, b in connections:
+            sources_of.setdefault(b, []).append(a)
+        required = set(outputs)
+        stack = list(required)
+        while stack:
+            for a in sources_of.get(stack.pop(), ()):
+                if a not in required:
+                    required.add(a)
+                    stack.append(a)
+    else:
+        required = None
+
+    sinks_of = {}
+    in_degree = {}
+    for a, b in connections:
+        if b in start_nodes or (required is not None and b not in required):
+            continue
+        sinks_of.setdefault(a, []).append(b)
+        in_degree[b] = in_degree.get(b, 0) + 1
 
     layers = []
-    prev_nodes = set(inputs)
-    prev_nodes.add(0)
+    frontier = start_nodes
     while 1:
-        # Find candidate nodes for the next layer.  These nodes should connect
-        # a node in S to a node not in S.
-        candidate_set = set(b for (a, b) in connections if a in prev_nodes and b not in prev_nodes)
-        # Keep only the nodes whose entire input set is contained in S.
-        keeper_set = set()
-        for n in candidate_set:
-            if all(a in prev_nodes for (a, b) in connections if b == n):
-                keeper_set.add(n)
-
-        if not keeper_set:
+        layer = set()
+        for a in frontier:
+            for b in sinks_of.get(a, ()):
+                in_degree[b] -= 1
+                if in_degree[b] == 0:
+                    layer.add(b)
+
+        if not layer:
             break
 
-        layers.append(keeper_set)
-        prev_nodes = prev_nodes.union(keeper_set)
+        layers.append(layer)
+        frontier = layer
 
     return layers
 
@@ -89,30 +114,89 @@ class FeedForwardPhenome:
         FeedForwardPhenome - A feedforward network
         Adapted from: https://github.com/CodeReclaimers/neat-python, accessed May 2016
 
+        The network is compiled into flat arrays: nodes are renumbered densely as
+        [bias, inputs..., evaluated nodes in topological order..., unevaluated outputs...]
+        and the enabled incoming links of evaluated node k are
+        src[indptr[k]:indptr[k+1]] with weights weight[indptr[k]:indptr[k+1]].
+
         :param genome: the genome to create the phenome
         """
-        self.graph, node_lists = self._construct_graph(genome)
-        self.input_nodes, self.hidden_nodes, self.output_nodes = node_lists
-        self.links = [(g.src, g.sink) for g in genome.link_genes]
-        self.node_evals = []
+        reporting.count('phenomes_built')
+        self.input_nodes = [g.idx for g in genome.input_genes]
+        self.hidden_nodes = [g.idx for g in genome.hidden_genes]
+        self.output_nodes = [g.idx for g in genome.output_genes]
+        link_genes = genome.link_genes
+        self.links = [(g.src, g.sink) for g in link_genes]
+        weights = [g.weight for g in link_genes]
+        enabled = [g.enabled for g in link_genes]
         self.config = config
-
-        layers = find_feed_forward_layers(self.input_nodes, self.links)
-        used_nodes = set(self.input_nodes + self.output_nodes)
-        for layer in layers:
-            for node in layer:
-                inputs = []
-                # TODO: This could be more efficient.
-                for cg in genome.link_genes:
-                    if cg.sink == node and cg.enabled:
-                        inputs.append((cg.src, cg.weight))
-                        used_nodes.add(cg.src)
-
-                used_nodes.add(node)
-                ng = genome.get_node_by_index(node)
-                activation_function = activation_functions.get(ng.activation)
-                self.node_evals.append((node, activation_function, inputs))
-        self.values = [0.0] * (1 + max(used_nodes))
+        # Snapshot of the link weights and flags for the graph, so the phenome holds no genes.
+        # Pickles leave it out; graphs of unpickled phenomes have links without attributes.
+        self._link_weight = np.array(weights, dtype=float)
+        self._link_enabled = np.array(enabled, dtype=bool)
+        self._graph = None
+
+        self.layers = find_feed_forward_layers(self.input_nodes, self.links, self.output_nodes)
+        self._compile(genome, weights, enabled)
+        self._serial_evals = None
+        self._layer_evals = None
+
+    def _compile(self, genome, weights, enabled):
+        """Builds the dense node numbering and CSR link arrays"""
+        incoming = {}
+        for (src, sink), w, on in zip(self.links, weights, enabled):
+            if on:
+                incoming.setdefault(sink, []).append((src, w))
+
+        eval_nodes = [node for layer in self.layers for node in sorted(layer)]
+        evaluated = set(eval_nodes)
+        node_order = [0] + self.input_nodes + eval_nodes
+        node_order += [node for node in self.output_nodes if node not in evaluated]
+        position = {node: pos for pos, node in enumerate(node_order)}
+        activation_ids = {name: i for i, name in enumerate(activation_types)}
+
+        indptr = [0]
+        src = []
+        weight = []
+        activation = []
+        for node in eval_nodes:
+            for idx, w in incoming.get(node, ()):
+                src.append(position[idx])
+                weight.append(w)
+            indptr.append(len(src))
+            activation.append(activation_ids[genome.get_node_by_index(node).activation])
+
+        self.node_order = np.array(node_order, dtype=np.int64)
+        self.first_eval = 1 + len(self.input_nodes)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.src = np.array(src, dtype=np.int64)
+        self.weight = np.array(weight, dtype=float)
+        self.activation = np.array(activation, dtype=np.int64)
+        self.layer_ptr = np.cumsum([0] + [len(layer) for layer in self.layers], dtype=np.int64)
+        self.output_index = np.array([position[node] for node in self.output_nodes], dtype=np.int64)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_serial_evals'] = None
+        state['_layer_evals'] = None
+        state['_graph'] = None
+        state['_link_weight'] = None
+        state['_link_enabled'] = None
+        return state
+
+    def prepare(self):
+        """Builds the serial and batch evaluation tables now rather than on first use"""
+        if self._serial_evals is None:
+            self._serial_evals = self._build_serial_evals()
+        if self._layer_evals is None:
+            self._layer_evals = self._build_layer_evals()
+
+    @property
+    def graph(self):
+        """networkx DiGraph of the genome, built on first access since only drawing needs it"""
+        if self._graph is None:
+            self._graph = self._construct_graph()
+        return self._graph
 
     def serial_activate(self, inputs):
         """
@@ -123,21 +207,87 @@ class FeedForwardPhenome:
         """
         if len(self.input_nodes) != len(inputs):
             raise ValueError("Expected {0} inputs, got {1}".format(len(self.input_nodes), len(inputs)))
-        self.values[0] = 1.0
+        if self._serial_evals is None:
+            self._serial_evals = self._build_serial_evals()
 
-        for idx, v in zip(self.input_nodes, inputs):
-            self.values[idx] = v
+        values = [0.0] * len(self.node_order)
+        values[0] = 1.0
+        values[1:self.first_eval] = inputs
 
-        for node, func, links in self.node_evals:
+        for pos, func, links in self._serial_evals:
             linear_activation = 0.0
             for idx, weight in links:
-                linear_activation += self.values[idx] * weight
-            self.values[node] = func(linear_activation)
+                linear_activation += values[idx] * weight
+            values[pos] = func(linear_activation)
+
+        return [values[i] for i in self._serial_outputs]
 
-        return [self.values[i] for i in self.output_nodes]
+    def batch_activate(self, inputs):
+        """
+        batch_activate - gives network outputs for many inputs at once, evaluating
+        each feed-forward layer as a single matrix product
+
+        :param inputs: array of shape (n_samples, num_inputs)
+        :return: array of shape (n_samples, num_outputs)
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.ndim != 2 or inputs.shape[1] != len(self.input_nodes):
+            raise ValueError("Expected array of shape (n_samples, {0}), got {1}".format(len(self.input_nodes),
+                                                                                      inputs.shape))
+        if self._layer_evals is None:
+            self._layer_evals = self._build_layer_evals()
+
+        values = np.zeros((inputs.shape[0], len(self.node_order)))
+        values[:, 0] = 1.0
+        values[:, 1:self.first_eval] = inputs
+
+        for lo, hi, sources, weights, groups in self._layer_evals:
+            linear_activation = values[:, sources] @ weights
+            for func, columns in groups:
+                linear_activation[:, columns] = func(linear_activation[:, columns])
+            values[:, lo:hi] = linear_activation
+
+        return values[:, self.output_index]
+
+    def _build_serial_evals(self):
+        """
+        Unpacks the CSR arrays into per-node (position, function, links) entries of plain Python
+        numbers, which index much faster than NumPy scalars for single-sample evaluation
+        """
+        indptr = self.indptr.tolist()
+        links = list(zip(self.src.tolist(), self.weight.tolist()))
+        serial_evals = []
+        for k, act in enumerate(self.activation.tolist()):
+            func = activation_functions.get(activation_types[act])
+            serial_evals.append((self.first_eval + k, func, links[indptr[k]:indptr[k + 1]]))
+        self._serial_outputs = self.output_index.tolist()
+        return serial_evals
+
+    def _build_layer_evals(self):
+        """
+        Expands each layer's CSR rows into (lo, hi, sources, weights, activation groups),
+        where weights is a dense (len(sources), hi - lo) matrix and lo:hi the layer's value positions
+        """
+        layer_evals = []
+        for first, last in zip(self.layer_ptr[:-1], self.layer_ptr[1:]):
+            start, stop = self.indptr[first], self.indptr[last]
+            rows = np.repeat(np.arange(last - first), np.diff(self.indptr[first:last + 1]))
+            sources, source_columns = np.unique(self.src[start:stop], return_inverse=True)
+            weights = np.zeros((len(sources), last - first))
+            np.add.at(weights, (source_columns, rows), self.weight[start:stop])
+            activations = self.activation[first:last]
+            groups = [(activation_functions.get_vectorized(activation_types[act]), np.flatnonzero(activations == act))
+                      for act in np.unique(activations)]
+            if len(groups) == 1:
+                groups = [(groups[0][0], slice(None))]
+            layer_evals.append((self.first_eval + first, self.first_eval + last, sources, weights, groups))
+        return layer_evals
 
     def draw(self, testing=False):
         """Draws the network with matplotlib"""
+        import networkx as nx
+        import matplotlib.pyplot as plt
+
         fig = plt.figure()
         pos = {0: (-1.5, 0)}
         for idx in range(len(self.input_nodes)):
@@ -170,33 +320,116 @@ class FeedForwardPhenome:
 
 
 
-    @staticmethod
-    def _construct_graph(genome):
+    def _construct_graph(self):
         """Constructs the DiGraph"""
+        import networkx as nx
+
         graph = nx.DiGraph()
-        graph.add_node(0, {'node_type': 'BIAS', 'val': 1})
-        input_list = []
-        output_list = []
-        hidden_list = []
+        graph.add_node(0, node_type='BIAS', val=1)
+        graph.add_nodes_from(self.input_nodes)
+        graph.add_nodes_from(self.output_nodes)
+        graph.add_nodes_from(self.hidden_nodes)
+
+        if self._link_weight is None:
+            graph.add_edges_from(self.links)
+        else:
+            for (src, sink), weight, enabled in zip(self.links, self._link_weight.tolist(),
+                                                    self._link_enabled.tolist()):
+                graph.add_edge(src, sink, weight=weight, enabled=enabled)
+        return graph
+
 
-        for gene in genome.input_genes:
-            graph.add_node(gene.idx)
-            input_list.append(gene.idx)
+_KEEP_BATCH_SIZE = object()
 
-        for gene in genome.output_genes:
-            graph.add_node(gene.idx)
-            output_list.append(gene.idx)
 
-        for gene in genome.hidden_genes:
-            graph.add_node(gene.idx)
-            hidden_list.append(gene.idx)
+class RecurrentPhenome:
+    def __init__(self, genome, config, *, batch_size=None):
+        """
+        RecurrentPhenome - a network whose links may form cycles, advanced one tick at a time
 
+        Every hidden and output node is updated on each tick from the current inputs and the
+        previous tick's node values, so a signal needs one tick per link to propagate.  Node
+        state is kept as a (batch_size, n_nodes) array, so independent episodes step in lockstep
+        with one matrix product per tick.
+
+        :param genome: the genome to create the phenome
+        :param config: configuration
+        :param batch_size: number of parallel episodes, or None for a single episode taking
+                           and returning 1-d arrays
+        """
+        reporting.count('phenomes_built')
+        self.input_nodes = [g.idx for g in genome.input_genes]
+        self.hidden_nodes = [g.idx for g in genome.hidden_genes]
+        self.output_nodes = [g.idx for g in genome.output_genes]
+        self.config = config
+
+        self.node_order = [0] + self.input_nodes + self.hidden_nodes + self.output_nodes
+        self.first_eval = 1 + len(self.input_nodes)
+        position = {node: pos for pos, node in enumerate(self.node_order)}
+        self.output_index = np.array([position[node] for node in self.output_nodes], dtype=np.int64)
+
+        self.weights = np.zeros((len(self.node_order), len(self.node_order) - self.first_eval))
         for gene in genome.link_genes:
-            graph.add_edge(gene.src, gene.sink,
-                           {'weight': gene.weight,
-                            'enabled': gene.enabled})
-        return graph, (input_list, hidden_list, output_list)
+            if gene.enabled:
+                self.weights[position[gene.src], position[gene.sink] - self.first_eval] += gene.weight
+
+        activations = [genome.get_node_by_index(node).activation for node in self.node_order[self.first_eval:]]
+        groups = {}
+        for col, activation in enumerate(activations):
+            groups.setdefault(activation, []).append(col)
+        self.groups = [(activation_functions.get_vectorized(activation), np.array(columns))
+                       for activation, columns in groups.items()]
+        if len(self.groups) == 1:
+            self.groups = [(self.groups[0][0], slice(None))]
+
+        self.reset(batch_size)
+
+    def reset(self, batch_size=_KEEP_BATCH_SIZE):
+        """
+        Clears the node state and starts new episodes
+
+        :param batch_size: number of parallel episodes, or None for a single episode;
+                           by default the current batch size is kept
+        """
+        if batch_size is _KEEP_BATCH_SIZE:
+            batch_size = self.batch_size
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.batch_size = batch_size
+        self.state = np.zeros((1 if batch_size is None else batch_size, len(self.node_order)))
+        self.state[:, 0] = 1.0
+
+    def step(self, inputs):
+        """
+        Advances every episode by one tick
+
+        :param inputs: array of shape (num_inputs,), or (batch_size, num_inputs) when batched
+        :return: array of shape (num_outputs,), or (batch_size, num_outputs) when batched
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        expected = (len(self.input_nodes),) if self.batch_size is None else (self.batch_size, len(self.input_nodes))
+        if inputs.shape != expected:
+            raise ValueError("Expected inputs of shape {0}, got {1}".format(expected, inputs.shape))
+
+        self.state[:, 1:self.first_eval] = inputs
+        linear_activation = self.state @ self.weights
+        for func, columns in self.groups:
+            linear_activation[:, columns] = func(linear_activation[:, columns])
+        self.state[:, self.first_eval:] = linear_activation
+
+        outputs = self.state[:, self.output_index]
+        return outputs[0] if self.batch_size is None else outputs
+
+    def run(self, sequence):
+        """
+        Steps through a sequence lazily, yielding the outputs of each tick
+
+        :param sequence: iterable of step inputs, which may be an unbounded generator
+        """
+        for inputs in sequence:
+            yield self.step(inputs)
 
 
 def handle_close(fig):
+    import matplotlib.pyplot as plt
     plt.close(fig)
\ No newline at end of file
@@ -0,0 +1,101 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from neat import innovation
+from neat.genes import NodeGene
+from neat.genome import ArrayGenome
+
+
+class Population:
+    def __init__(self, config, genomes):
+        """
+        Population - the genomes of one generation
+
+        :param config: configuration
+        :param genomes: list of genomes
+        """
+        self.config = config
+        self._genomes = list(genomes)
+        self._template = None
+
+    @classmethod
+    def initialize(cls, config, *, pop_size=None, registry=None, rng=None):
+        """
+        Initial population of fully connected genomes, all with the same topology: every
+        output linked from the bias and every input.  The topology is built once and shared:
+        genomes are ArrayGenomes whose node genes and src, sink and innovation arrays are
+        those of the template, and whose weight and enabled arrays are rows of population-wide
+        matrices.  All weights are drawn with a single call, and each genome is only built
+        when first accessed.
+
+        :param config: configuration
+        :param pop_size: number of genomes, defaults to config.pop_size
+        :param registry: InnovationRegistry numbering the links, defaults to innovation.default_registry
+        :param rng: numpy Generator or RandomState, defaults to numpy.random
+        :return: Population
+        """
+        pop_size = config.pop_size if pop_size is None else pop_size
+        if pop_size < 1:
+            raise ValueError("Population needs at least one genome")
+        registry = registry or innovation.default_registry
+        rng = np.random if rng is None else rng
+        n_inputs, n_outputs = config.num_inputs, config.num_outputs
+
+        registry.reserve_nodes(n_inputs + n_outputs)
+        node_genes = ([NodeGene(node_type='INPUT', idx=i + 1) for i in range(n_inputs)] +
+                      [NodeGene(node_type='OUTPUT', idx=n_inputs + i + 1) for i in range(n_outputs)])
+        # Same link order as Genome._random_genome: per output, the bias then each input
+        src = np.tile(np.arange(n_inputs + 1, dtype=np.int64), n_outputs)
+        sink = np.repeat(np.arange(n_inputs + 1, n_inputs + n_outputs + 1, dtype=np.int64), n_inputs + 1)
+        link_innovation = np.array([registry.get_link_innovation(s, t) for s, t in zip(src.tolist(), sink.tolist())],
+                                   dtype=np.int64)
+        order = np.argsort(link_innovation, kind='stable')
+        arrays = [src[order], sink[order], link_innovation[order]]
+        for array in arrays:
+            array.flags.writeable = False
+
+        population = cls(config, [None] * pop_size)
+        population._template = (node_genes, arrays)
+        population.weights = rng.random((pop_size, len(order)))
+        population.enabled = np.ones((pop_size, len(order)), dtype=bool)
+        return population
+
+    def __len__(self):
+        return len(self._genomes)
+
+    def __getitem__(self, i):
+        """Genome i, built from the template on first access"""
+        genome = self._genomes[i]
+        if genome is None:
+            node_genes, (src, sink, link_innovation) = self._template
+            genome = ArrayGenome.from_arrays(self.config, node_genes, src, sink, self.weights[i], self.enabled[i],
+                                             link_innovation, copy=False)
+            self._genomes[i] = genome
+        return genome
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def n_materialized(self):
+        """Number of genomes built so far"""
+        return sum(genome is not None for genome in self._genomes)
+
+    def genomes(self):
+        """List of all genomes, building those not yet accessed"""
+        return list(self)
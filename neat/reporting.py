@@ -0,0 +1,199 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+import json
+import time
+
+GenerationReport = namedtuple('GenerationReport', ['generation', 'seconds', 'spans', 'counters'])
+
+# Instrumentation collecting the generation in progress, None when instrumentation is off
+_active = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('spans', 'name', 'start')
+
+    def __init__(self, spans, name):
+        self.spans = spans
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.spans[self.name] = self.spans.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def span(name):
+    """
+    Context manager timing a phase of the current generation, such as 'evaluation'.
+    Times of spans with the same name add up.  Does nothing outside Instrumentation.generation.
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _Span(_active.spans, name)
+
+
+def record_span(name, seconds):
+    """Adds a phase timed by the caller to the spans of the current generation"""
+    if _active is not None:
+        _active.spans[name] = _active.spans.get(name, 0.0) + seconds
+
+
+def count(name, n=1):
+    """Adds n to a counter of the current generation; does nothing outside Instrumentation.generation"""
+    if _active is not None:
+        _active.counters[name] = _active.counters.get(name, 0) + n
+
+
+class Reporter:
+    """
+    Reporter - receives the instrumentation of each generation; override the methods needed
+    """
+    def start_generation(self, generation):
+        pass
+
+    def end_generation(self, report):
+        pass
+
+    def close(self):
+        pass
+
+
+class Instrumentation:
+    def __init__(self, reporters=()):
+        """
+        Instrumentation - collects timed spans and counters for each generation and hands a
+        GenerationReport to the reporters when the generation ends
+
+        The library records its phases (phenome_building, evaluation, speciation, mutation)
+        and counters (phenomes_built, genomes_evaluated, distance_calls, distance_cache_hits,
+        offspring) through the module functions span and count, which only do work inside
+        a generation block:
+
+            instrumentation = Instrumentation([JSONLinesReporter('run.jsonl'), ProfileReporter(10)])
+            for generation in range(n):
+                with instrumentation.generation(generation):
+                    ...
+                    with span('reproduction'):
+                        ...
+
+        :param reporters: list of Reporters
+        """
+        self.reporters = list(reporters)
+        self.reports = []
+        self.spans = {}
+        self.counters = {}
+        self._generation = None
+        self._start = None
+        self._previous = None
+
+    def generation(self, generation):
+        """Context manager instrumenting one generation"""
+        if self._start is not None:
+            raise RuntimeError("Instrumentation is already collecting a generation")
+        self._generation = generation
+        return self
+
+    def __enter__(self):
+        global _active
+        if self._start is not None:
+            raise RuntimeError("Instrumentation is already collecting a generation")
+        self.spans = {}
+        self.counters = {}
+        for reporter in self.reporters:
+            reporter.start_generation(self._generation)
+        self._previous = _active
+        _active = self
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active
+        seconds = time.perf_counter() - self._start
+        _active = self._previous
+        self._start = None
+        report = GenerationReport(generation=self._generation, seconds=seconds, spans=self.spans,
+                                  counters=self.counters)
+        self.reports.append(report)
+        for reporter in self.reporters:
+            reporter.end_generation(report)
+        return False
+
+    def close(self):
+        """Closes the reporters"""
+        for reporter in self.reporters:
+            reporter.close()
+
+
+class JSONLinesReporter(Reporter):
+    def __init__(self, filename):
+        """
+        JSONLinesReporter - writes each GenerationReport as one JSON object per line
+
+        :param filename: output file, overwritten
+        """
+        self.file = open(filename, 'w')
+
+    def end_generation(self, report):
+        self.file.write(json.dumps(report._asdict()) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ProfileReporter(Reporter):
+    def __init__(self, generation, filename=None):
+        """
+        ProfileReporter - runs cProfile during one generation only
+
+        :param generation: generation to profile
+        :param filename: if given, the profile is saved there for pstats or snakeviz
+        """
+        self.generation = generation
+        self.filename = filename
+        self.profile = None
+        self.stats = None
+
+    def start_generation(self, generation):
+        if generation == self.generation:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def end_generation(self, report):
+        if self.profile is None:
+            return
+        import pstats
+        self.profile.disable()
+        self.stats = pstats.Stats(self.profile)
+        if self.filename is not None:
+            self.stats.dump_stats(self.filename)
+        self.profile = None
@@ -0,0 +1,128 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Binary population checkpoints
+
+A file holds, in order:
+ - a 32 byte header: MAGIC, then the number of genomes, node genes and link genes as
+   little-endian uint64
+ - a genome table of GENOME_DTYPE with one row per genome plus a final row holding the
+   total node and link counts, so genome i owns nodes[node_offset[i]:node_offset[i + 1]]
+   and likewise for links
+ - all node genes as NODE_DTYPE records
+ - all link genes as LINK_DTYPE records
+
+Every section is opened with np.memmap, so reading a genome only touches its own records.
+"""
+
+import numpy as np
+
+from neat.activations import activation_types
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+
+MAGIC = b'NEATPOP1'
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('n_genomes', '<u8'), ('n_nodes', '<u8'), ('n_links', '<u8')])
+GENOME_DTYPE = np.dtype([('node_offset', '<i8'), ('link_offset', '<i8'), ('fitness', '<f8')])
+NODE_DTYPE = np.dtype([('idx', '<i8'), ('node_type', 'u1'), ('activation', 'u1')])
+LINK_DTYPE = np.dtype([('src', '<i8'), ('sink', '<i8'), ('weight', '<f8'), ('enabled', '?'),
+                       ('innovation', '<i8')])
+
+NODE_TYPES = ['INPUT', 'HIDDEN', 'OUTPUT']
+NODE_TYPE_IDS = {name: i for i, name in enumerate(NODE_TYPES)}
+ACTIVATION_IDS = {name: i for i, name in enumerate(activation_types)}
+
+
+def save_population(filename, genomes):
+    """
+    Writes genomes to a binary population file
+
+    :param filename: path of the file to write
+    :param genomes: list of genomes
+    """
+    table = np.zeros(len(genomes) + 1, dtype=GENOME_DTYPE)
+    table['node_offset'][1:] = np.cumsum([len(g.input_genes) + len(g.hidden_genes) + len(g.output_genes)
+                                          for g in genomes])
+    table['link_offset'][1:] = np.cumsum([len(g.link_genes) for g in genomes])
+    table['fitness'][:-1] = [g.fitness for g in genomes]
+    header = np.array([(MAGIC, len(genomes), table['node_offset'][-1], table['link_offset'][-1])],
+                      dtype=HEADER_DTYPE)
+
+    with open(filename, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(table.tobytes())
+        for genome in genomes:
+            nodes = [(g.idx, NODE_TYPE_IDS[g.node_type], ACTIVATION_IDS[g.activation]) for g in genome.node_genes()]
+            f.write(np.array(nodes, dtype=NODE_DTYPE).tobytes())
+        for genome in genomes:
+            links = [(g.src, g.sink, g.weight, g.enabled, g.innovation_number) for g in genome.link_genes]
+            f.write(np.array(links, dtype=LINK_DTYPE).tobytes())
+
+
+class PopulationFile:
+    def __init__(self, filename, config):
+        """
+        PopulationFile - read-only, memory-mapped view of a population file that builds
+        genomes on demand
+
+        :param filename: path of a file written by save_population
+        :param config: Configuration given to the rebuilt genomes
+        """
+        self.config = config
+        header = np.fromfile(filename, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header['magic'][0] != MAGIC:
+            raise ValueError("Not a population file: " + str(filename))
+        n_genomes, n_nodes, n_links = (int(header[name][0]) for name in ('n_genomes', 'n_nodes', 'n_links'))
+
+        offset = HEADER_DTYPE.itemsize
+        self.table = np.memmap(filename, dtype=GENOME_DTYPE, mode='r', offset=offset, shape=(n_genomes + 1,))
+        offset += GENOME_DTYPE.itemsize * (n_genomes + 1)
+        self.nodes = self._map(filename, NODE_DTYPE, offset, n_nodes)
+        offset += NODE_DTYPE.itemsize * n_nodes
+        self.links = self._map(filename, LINK_DTYPE, offset, n_links)
+
+    @staticmethod
+    def _map(filename, dtype, offset, count):
+        # np.memmap refuses empty mappings
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+    def __len__(self):
+        return len(self.table) - 1
+
+    def __getitem__(self, i):
+        """Rebuilds genome i from its node and link records"""
+        if not -len(self) <= i < len(self):
+            raise IndexError("Population file has no genome %i" % i)
+        i %= len(self)
+        row, next_row = self.table[i], self.table[i + 1]
+        nodes = self.nodes[row['node_offset']:next_row['node_offset']]
+        links = self.links[row['link_offset']:next_row['link_offset']]
+        node_genes = [NodeGene(idx=idx, node_type=NODE_TYPES[node_type], activation=activation_types[activation])
+                      for idx, node_type, activation in nodes.tolist()]
+        link_genes = [LinkGene(src, sink, weight=weight, enabled=enabled, innov=innovation)
+                      for src, sink, weight, enabled, innovation in links.tolist()]
+        return Genome.from_validated(self.config, node_genes, link_genes, fitness=float(row['fitness']))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def load_population(filename, config):
+    """Opens a population file; genomes are only rebuilt when indexed"""
+    return PopulationFile(filename, config)
@@ -0,0 +1,129 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+import time
+
+from neat import reporting
+from neat.cache import LRUCache
+
+SpeciationReport = namedtuple('SpeciationReport',
+                              ['generation', 'n_species', 'distance_calls', 'cache_hits', 'hit_rate', 'seconds'])
+
+
+class Species:
+    def __init__(self, key, generation, representative):
+        """
+        Species - a group of mutually compatible genomes
+
+        :param key: species identifier
+        :param generation: generation the species appeared in
+        :param representative: genome new members are compared against
+        """
+        self.key = key
+        self.created = generation
+        self.representative = representative
+        self.members = [representative]
+
+
+class SpeciesSet:
+    def __init__(self, config, *, cache_size=100000):
+        """
+        SpeciesSet - assigns genomes to species by compatibility distance to the species
+        representatives
+
+        Distances are memoized in a bounded LRU cache keyed by the identity of both genomes;
+        entries hold references to the genomes so an identity cannot be reused while cached.
+        Genomes must not be modified once they have been speciated.
+
+        :param config: Configuration
+        :param cache_size: maximum number of cached distances
+        """
+        self.config = config
+        self.species = {}
+        self.genome_to_species = {}
+        self.distance_cache = LRUCache(cache_size)
+        self.reports = []
+        self._next_key = 1
+
+    def distance(self, genome1, genome2):
+        """genome1.distance(genome2), from the cache when possible"""
+        key = (id(genome1), id(genome2))
+        entry = self.distance_cache.get(key)
+        if entry is None:
+            entry = (genome1, genome2, genome1.distance(genome2))
+            self.distance_cache.put(key, entry)
+        return entry[2]
+
+    def speciate(self, genomes, generation):
+        """
+        Places genomes into species: every surviving species takes the genome closest to
+        its old representative as new representative, then each remaining genome joins the
+        closest species within the compatibility threshold, or founds a new one.
+        Species left without members are removed.
+
+        :param genomes: list of genomes of the generation
+        :param generation: generation number
+        :return: SpeciationReport for the generation, also appended to reports
+        """
+        start = time.perf_counter()
+        hits, misses = self.distance_cache.hits, self.distance_cache.misses
+        threshold = self.config.compatibility_threshold
+
+        unspeciated = {id(genome): genome for genome in genomes}
+        species = {}
+        for key, old in self.species.items():
+            if not unspeciated:
+                break
+            _, representative = min(((self.distance(old.representative, genome), genome)
+                                     for genome in unspeciated.values()), key=lambda candidate: candidate[0])
+            del unspeciated[id(representative)]
+            old.representative = representative
+            old.members = [representative]
+            species[key] = old
+
+        for genome in unspeciated.values():
+            best_distance, best_species = threshold, None
+            for s in species.values():
+                d = self.distance(s.representative, genome)
+                if d < best_distance:
+                    best_distance, best_species = d, s
+            if best_species is None:
+                best_species = Species(self._next_key, generation, genome)
+                species[self._next_key] = best_species
+                self._next_key += 1
+            else:
+                best_species.members.append(genome)
+
+        self.species = species
+        self.genome_to_species = {id(genome): key for key, s in species.items() for genome in s.members}
+
+        cache_hits = self.distance_cache.hits - hits
+        distance_calls = cache_hits + self.distance_cache.misses - misses
+        report = SpeciationReport(generation=generation,
+                                  n_species=len(species),
+                                  distance_calls=distance_calls,
+                                  cache_hits=cache_hits,
+                                  hit_rate=cache_hits / distance_calls if distance_calls else 0.0,
+                                  seconds=time.perf_counter() - start)
+        self.reports.append(report)
+        reporting.record_span('speciation', report.seconds)
+        reporting.count('distance_calls', distance_calls)
+        reporting.count('distance_cache_hits', cache_hits)
+        return report
+
+    def get_species_key(self, genome):
+        """Key of the species the genome was placed in by the last speciate call"""
+        return self.genome_to_species[id(genome)]
@@ -0,0 +1,58 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+import numpy as np
+
+from neat import activation_functions
+from neat.activations import activation_types
+
+
+class TestActivationFunctions(TestCase):
+
+    def setUp(self):
+        self.z = np.concatenate([np.linspace(-100.0, 100.0, 41), np.linspace(-2.0, 2.0, 41), [0.0, 1e-9, -1e-9]])
+
+    def test_every_activation_type_is_registered(self):
+        for name in activation_types:
+            assert activation_functions.is_valid(name), "%s is not registered" % name
+
+    def test_vectorized_forms_match_scalar_forms(self):
+        for name in activation_types:
+            scalar = activation_functions.get(name)
+            vectorized = activation_functions.get_vectorized(name)
+            expected = np.array([scalar(float(z)) for z in self.z])
+            np.testing.assert_allclose(vectorized(self.z.copy()), expected, rtol=1e-12, err_msg=name)
+
+    def test_vectorized_forms_match_scalar_forms_on_strided_views(self):
+        for name in activation_types:
+            scalar = activation_functions.get(name)
+            values = np.zeros((len(self.z), 3))
+            values[:, 1] = self.z
+            activation_functions.get_vectorized(name)(values[:, 1:2])
+            expected = np.array([scalar(float(z)) for z in self.z])
+            np.testing.assert_allclose(values[:, 1], expected, rtol=1e-12, err_msg=name)
+            assert not values[:, 0].any() and not values[:, 2].any(), name
+
+    def test_vectorized_forms_work_in_place(self):
+        for name in activation_types:
+            z = self.z.copy()
+            result = activation_functions.get_vectorized(name)(z)
+            assert result is z, "%s did not work in place" % name
+
+    def test_scalar_forms_return_floats(self):
+        for name in activation_types:
+            assert isinstance(activation_functions.get(name)(0.5), float), name
@@ -0,0 +1,52 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from benchmarks.suite import compare, format_results, main, make_genome
+
+
+class TestBenchmarkSuite(TestCase):
+    def setUp(self):
+        self.baseline = {'a': {'seconds': 1.0, 'params': {}}, 'b': {'seconds': 2.0, 'params': {'links': 3}}}
+
+    def test_compare_flags_slowdowns_above_threshold(self):
+        results = {'a': {'seconds': 1.1, 'params': {}}, 'b': {'seconds': 3.0, 'params': {'links': 3}},
+                   'new': {'seconds': 1.0, 'params': {}}}
+        rows = {row[0]: row for row in compare(results, self.baseline, 0.2)}
+        assert set(rows) == {'a', 'b'}
+        assert not rows['a'][4]
+        assert rows['b'][4] and rows['b'][3] == 1.5
+        assert 'REGRESSION' in format_results(results, list(rows.values())).splitlines()[2]
+
+    def test_make_genome_has_requested_size(self):
+        genome, _ = make_genome(3, 2, 2)
+        assert genome.size() == (2, 4 * 2 + 4 * 2 + 2 * 2)
+
+    def test_main_writes_results_and_exit_status(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ('out.json', 'out.txt', 'base.json')]
+            with open(paths[2], 'w') as f:
+                json.dump({'results': {'activation/relu/vectorized': {'seconds': 1e-12, 'params': {}}}}, f)
+            status = main(['--quick', '--filter', 'relu/vectorized', '--json', paths[0], '--text', paths[1],
+                           '--baseline', paths[2]])
+            assert status == 1
+            with open(paths[0]) as f:
+                assert list(json.load(f)['results']) == ['activation/relu/vectorized']
+            with open(paths[1]) as f:
+                assert 'REGRESSION' in f.read()
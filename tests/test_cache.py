@@ -0,0 +1,210 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+import numpy as np
+
+from benchmarks import make_genome
+from neat.cache import FitnessCache, LRUCache, PhenomeCache, estimate_size, phenome_key
+from neat.config import Config
+from neat.evaluation import PopulationEvaluator
+from neat.genes import NodeGene, LinkGene
+from neat.genome import ArrayGenome, Genome
+from neat.phenome import FeedForwardPhenome
+from neat.reporting import Instrumentation
+
+
+class TestLRUCacheBudget(TestCase):
+
+    def test_cache_evicts_beyond_byte_budget(self):
+        cache = LRUCache(None, max_bytes=10, sizeof=len)
+        cache.put('a', 'xxxx')
+        cache.put('b', 'xxxx')
+        cache.put('c', 'xxxx')
+        assert 'a' not in cache and 'b' in cache and 'c' in cache
+        assert (cache.n_bytes, cache.evictions) == (8, 1)
+
+    def test_cache_keeps_newest_entry_over_budget(self):
+        cache = LRUCache(None, max_bytes=2, sizeof=len)
+        cache.put('a', 'xxxx')
+        assert 'a' in cache and cache.n_bytes == 4
+
+    def test_byte_budget_needs_sizeof(self):
+        with self.assertRaises(ValueError):
+            LRUCache(None, max_bytes=10)
+
+
+class TestPhenomeCache(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.genome = self.make_genome()
+
+    def make_genome(self, weight=0.5, enabled=True):
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', activation='identity', idx=3),
+                      NodeGene(node_type='OUTPUT', activation='tanh', idx=4),
+                      NodeGene(node_type='HIDDEN', activation='relu', idx=5)]
+        link_genes = [LinkGene(1, 5, weight=weight, innov=0),
+                      LinkGene(5, 3, weight=1.0, innov=1),
+                      LinkGene(2, 3, weight=-1.0, innov=2, enabled=enabled),
+                      LinkGene(2, 4, weight=0.3, innov=3)]
+        return Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+
+    def test_key_depends_on_weights_and_enabled_links_only(self):
+        key = phenome_key(self.genome)
+        assert phenome_key(self.make_genome()) == key
+        assert phenome_key(ArrayGenome.from_genome(self.genome)) == key
+        assert phenome_key(self.make_genome(weight=0.6)) != key
+        assert phenome_key(self.make_genome(enabled=False)) != key
+        disabled = self.make_genome(enabled=False)
+        disabled.link_genes[2].weight = 5.0
+        assert phenome_key(disabled) == phenome_key(self.make_genome(enabled=False))
+
+    def test_cache_reuses_phenomes_of_equal_genomes(self):
+        cache = PhenomeCache(self.config)
+        phenome = cache.get(self.genome)
+        assert cache.get(self.make_genome()) is phenome
+        assert cache.get(self.make_genome(weight=2.0)) is not phenome
+        assert cache.stats() == {'entries': 2, 'hits': 1, 'misses': 2, 'evictions': 0,
+                                 'hit_rate': 1 / 3, 'n_bytes': 0}
+
+    def test_cached_phenome_gives_same_outputs(self):
+        inputs = np.random.uniform(-2.0, 2.0, size=(10, 2))
+        phenome = PhenomeCache(self.config).get(self.genome)
+        np.testing.assert_array_equal(phenome.batch_activate(inputs),
+                                      FeedForwardPhenome(self.genome, self.config).batch_activate(inputs))
+
+    def test_cache_stays_within_entry_budget(self):
+        cache = PhenomeCache(self.config, max_entries=2)
+        for weight in (0.1, 0.2, 0.3):
+            cache.get(self.make_genome(weight=weight))
+        assert len(cache) == 2 and cache.evictions == 1
+        cache.get(self.make_genome(weight=0.1))
+        assert cache.misses == 4
+
+    def test_cache_stays_within_byte_budget(self):
+        cache = PhenomeCache(self.config, max_entries=None, max_bytes=1)
+        cache.get(self.genome)
+        size = cache.n_bytes
+        assert size > 0
+        cache = PhenomeCache(self.config, max_entries=None, max_bytes=int(2.5 * size))
+        for weight in (0.1, 0.2, 0.3, 0.4):
+            cache.get(self.make_genome(weight=weight))
+        assert len(cache) == 2 and cache.evictions == 2
+        assert cache.n_bytes <= 2.5 * size
+
+    def test_estimate_size_counts_nested_containers(self):
+        class Holder:
+            pass
+
+        flat, nested = Holder(), Holder()
+        flat.items = [()] * 100
+        nested.items = [(float(i), [float(i)]) for i in range(100)]
+        assert estimate_size(nested) > estimate_size(flat) + 100 * 24 * 2
+
+    def test_byte_budget_holds_after_activation(self):
+        genomes = [make_genome(20, 5, 2, seed=seed)[0] for seed in range(6)]
+        size = estimate_size(PhenomeCache(self.config, max_bytes=1).get(genomes[0]))
+        budget = int(3.5 * size)
+        cache = PhenomeCache(self.config, max_entries=None, max_bytes=budget)
+        phenomes = [cache.get(genome) for genome in genomes]
+        for phenome in phenomes:
+            phenome.serial_activate([0.5] * 20)
+            phenome.batch_activate(np.ones((3, 20)))
+        held = [phenome for genome, phenome in zip(genomes, phenomes) if phenome_key(genome) in cache.cache]
+        assert len(held) == len(cache) == 3
+        assert sum(estimate_size(phenome) for phenome in held) == cache.n_bytes <= budget
+
+    def test_population_evaluator_takes_phenomes_from_cache(self):
+        genomes = [self.genome, self.make_genome(), self.make_genome(weight=2.0)]
+        inputs = np.random.uniform(-2.0, 2.0, size=(10, 2))
+        cache = PhenomeCache(self.config)
+        expected = PopulationEvaluator(genomes, self.config).evaluate(inputs)
+        instrumentation = Instrumentation()
+        with instrumentation.generation(0):
+            outputs = PopulationEvaluator(genomes, self.config, phenome_cache=cache).evaluate(inputs)
+        np.testing.assert_array_equal(outputs, expected)
+        counters = instrumentation.reports[0].counters
+        assert (counters['phenome_cache_hits'], counters['phenome_cache_misses']) == (1, 2)
+        assert counters['phenomes_built'] == 2
+
+
+class TestFitnessCache(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.genomes = [Genome(self.config) for _ in range(4)]
+        self.evaluated = []
+
+    def evaluate(self, genomes):
+        self.evaluated.extend(genomes)
+        return [float(genome.n_links) for genome in genomes]
+
+    def fitness(self, genome):
+        return float(genome.n_links)
+
+    def clone(self, genome):
+        return ArrayGenome.from_genome(genome)
+
+    def test_cache_evaluates_each_network_once(self):
+        cache = FitnessCache()
+        genomes = self.genomes + [self.clone(genome) for genome in self.genomes[:2]]
+        fitnesses = cache.evaluate(genomes, self.evaluate)
+        assert fitnesses == [float(genome.n_links) for genome in genomes]
+        assert self.evaluated == self.genomes
+        assert cache.evaluate([self.clone(genome) for genome in self.genomes], self.evaluate) == fitnesses[:4]
+        assert len(self.evaluated) == 4
+        assert cache.stats() == {'entries': 4, 'hits': 4, 'misses': 4, 'evictions': 0, 'evaluations_saved': 6}
+
+    def test_changed_weights_are_evaluated_again(self):
+        cache = FitnessCache()
+        cache.evaluate(self.genomes[:1], self.evaluate)
+        self.genomes[0].link_genes[0].weight += 1.0
+        cache.evaluate(self.genomes[:1], self.evaluate)
+        assert len(self.evaluated) == 2
+
+    def test_new_version_invalidates_cache(self):
+        cache = FitnessCache(version=1)
+        cache.evaluate(self.genomes, self.evaluate)
+        cache.set_version(1)
+        cache.evaluate(self.genomes, self.evaluate)
+        assert len(self.evaluated) == 4
+        cache.set_version(2)
+        cache.evaluate(self.genomes, self.evaluate)
+        assert len(self.evaluated) == 8
+
+    def test_new_fitness_function_invalidates_cache(self):
+        cache = FitnessCache()
+        cache.evaluate(self.genomes, self.evaluate, self.fitness)
+        cache.evaluate(self.genomes, self.evaluate, self.fitness)
+        assert len(self.evaluated) == 4
+        cache.evaluate(self.genomes, self.evaluate, len)
+        assert len(self.evaluated) == 8
+
+    def test_cache_stays_within_entry_budget(self):
+        cache = FitnessCache(max_entries=2)
+        cache.evaluate(self.genomes, self.evaluate)
+        assert len(cache) == 2 and cache.cache.evictions == 2
+
+    def test_saved_evaluations_are_reported_per_generation(self):
+        cache = FitnessCache()
+        instrumentation = Instrumentation()
+        for generation in range(2):
+            with instrumentation.generation(generation):
+                cache.evaluate(self.genomes + [self.clone(self.genomes[0])], self.evaluate)
+        assert [report.counters['evaluations_saved'] for report in instrumentation.reports] == [1, 5]
@@ -0,0 +1,83 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+from unittest import TestCase
+
+import numpy as np
+
+from neat import codegen
+from neat.activations import activation_types
+from neat.codegen import GeneratedPhenome
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+from neat.phenome import FeedForwardPhenome
+
+
+class TestGeneratedPhenome(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        codegen.clear_cache()
+
+    def make_genome(self, activation, weights=(0.5, -1.5, 2.0, -0.7, 0.2, 0.9)):
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', activation=activation, idx=3),
+                      NodeGene(node_type='OUTPUT', activation='identity', idx=4),
+                      NodeGene(node_type='HIDDEN', activation=activation, idx=5)]
+        links = [(1, 5), (2, 5), (5, 3), (0, 3), (1, 3), (2, 4)]
+        link_genes = [LinkGene(src, sink, weight=w, innov=i) for i, ((src, sink), w) in enumerate(zip(links, weights))]
+        return Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+
+    def test_generated_phenome_matches_serial_activate(self):
+        inputs = np.random.uniform(-3.0, 3.0, size=(20, 2)).tolist() + [[0.0, 0.0], [100.0, -100.0]]
+        for activation in activation_types:
+            genome = self.make_genome(activation)
+            phenome = FeedForwardPhenome(genome, self.config)
+            generated = GeneratedPhenome(genome, self.config)
+            for x in inputs:
+                assert generated.serial_activate(x) == phenome.serial_activate(x), activation
+
+    def test_same_structure_shares_generated_code(self):
+        first = GeneratedPhenome(self.make_genome('sigmoid'), self.config)
+        second = GeneratedPhenome(self.make_genome('sigmoid', weights=(1, 2, 3, 4, 5, 6)), self.config)
+        assert first._activate.__code__ is second._activate.__code__
+        assert len(codegen._factories) == 1
+        assert first.serial_activate([1.0, 1.0]) != second.serial_activate([1.0, 1.0])
+
+    def test_generated_phenome_survives_pickling(self):
+        generated = GeneratedPhenome(self.make_genome('tanh'), self.config)
+        restored = pickle.loads(pickle.dumps(generated))
+        assert restored.serial_activate([0.3, -0.2]) == generated.serial_activate([0.3, -0.2])
+
+    def test_generated_phenome_requires_correct_num_inputs(self):
+        generated = GeneratedPhenome(self.make_genome('sigmoid'), self.config)
+        try:
+            generated.serial_activate([1.0, 1.0, 1.0])
+            self.fail("Phenome should raise exception if number of inputs is wrong")
+        except ValueError:
+            pass
+
+    def test_generated_phenome_compiles_large_fan_in(self):
+        self.config.num_inputs = 3000
+        self.config.num_outputs = 1
+        genome = Genome(self.config)
+        phenome = FeedForwardPhenome(genome, self.config)
+        assert max(np.diff(phenome.indptr)) >= 3000
+        generated = GeneratedPhenome(genome, self.config)
+        inputs = np.random.uniform(-1.0, 1.0, size=3000).tolist()
+        assert generated.serial_activate(inputs) == phenome.serial_activate(inputs)
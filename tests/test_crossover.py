@@ -0,0 +1,99 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+import numpy as np
+
+from neat.config import Config
+from neat.crossover import crossover
+from neat.genes import NodeGene, LinkGene
+from neat.genome import ArrayGenome, Genome
+from neat.innovation import InnovationRegistry
+
+
+class TestCrossover(TestCase):
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.registry = InnovationRegistry()
+        nodes = lambda: [NodeGene(node_type='INPUT', idx=1), NodeGene(node_type='INPUT', idx=2),
+                         NodeGene(node_type='OUTPUT', idx=3), NodeGene(node_type='OUTPUT', idx=4)]
+        # Innovations 0..3 match, 4 is disjoint in parent1, 5 is excess in parent2
+        self.parent1 = Genome(self.config, node_genes=nodes() + [NodeGene(node_type='HIDDEN', idx=5)],
+                              link_genes=[LinkGene(1, 3, weight=1.0, innov=0), LinkGene(2, 3, weight=1.0, innov=1),
+                                          LinkGene(1, 4, weight=1.0, innov=2), LinkGene(2, 4, weight=1.0, innov=3),
+                                          LinkGene(1, 5, weight=1.0, innov=4)])
+        self.parent2 = Genome(self.config, node_genes=nodes(),
+                              link_genes=[LinkGene(1, 3, weight=2.0, innov=0), LinkGene(2, 3, weight=2.0, innov=1),
+                                          LinkGene(1, 4, weight=2.0, innov=2),
+                                          LinkGene(2, 4, weight=2.0, innov=3, enabled=False),
+                                          LinkGene(0, 3, weight=2.0, innov=5)])
+
+    def _check_child(self, child, fitter):
+        assert [g.innovation_number for g in child.link_genes] == [g.innovation_number for g in fitter.link_genes]
+        assert [g.idx for g in child.node_genes()] == [g.idx for g in fitter.node_genes()]
+        assert child.fitness == 0
+
+    def test_child_takes_structure_from_fitter_parent(self):
+        self.parent1.fitness = 2
+        child = crossover(self.parent1, self.parent2, np.random.default_rng(0))
+        self._check_child(child, self.parent1)
+        assert child.get_link_by_indices(1, 5).weight == 1.0
+
+        self.parent2.fitness = 3
+        child = crossover(self.parent1, self.parent2, np.random.default_rng(0))
+        self._check_child(child, self.parent2)
+        assert child.get_link_by_indices(0, 3).weight == 2.0
+
+    def test_matching_genes_come_from_both_parents(self):
+        children = [crossover(self.parent1, self.parent2, np.random.default_rng(seed)) for seed in range(50)]
+        weights = np.array([[g.weight for g in child.link_genes[:4]] for child in children])
+        assert set(weights.ravel()) == {1.0, 2.0}
+        assert 0.3 < np.mean(weights == 2.0) < 0.7
+        for seed in range(20):
+            child = crossover(self.parent1, self.parent2, np.random.default_rng(seed))
+            link = child.get_link_by_indices(2, 4)
+            assert link.enabled == (link.weight == 1.0)
+
+    def test_child_shares_no_genes_with_parents(self):
+        child = crossover(self.parent1, self.parent2)
+        child.link_genes[0].weight = 10.0
+        child.node_genes()[2].activation = 'relu'
+        assert self.parent1.link_genes[0].weight == 1.0 and self.parent2.link_genes[0].weight == 2.0
+        assert self.parent1.node_genes()[2].activation == 'sigmoid'
+
+    def test_child_is_valid_genome(self):
+        child = crossover(self.parent1, self.parent2)
+        Genome(self.config, node_genes=child.node_genes(), link_genes=child.link_genes)
+
+    def test_array_genomes_match_genomes(self):
+        array1 = ArrayGenome.from_genome(self.parent1)
+        array2 = ArrayGenome.from_genome(self.parent2)
+        for seed in range(10):
+            child = crossover(self.parent1, self.parent2, np.random.default_rng(seed))
+            array_child = crossover(array1, array2, np.random.default_rng(seed))
+            mixed_child = crossover(array1, self.parent2, np.random.default_rng(seed))
+            assert isinstance(array_child, ArrayGenome)
+            fields = lambda genome: [(g.src, g.sink, g.weight, g.enabled, g.innovation_number)
+                                     for g in genome.link_genes]
+            assert fields(array_child) == fields(child) == fields(mixed_child)
+
+    def test_crossover_with_empty_parent(self):
+        empty = Genome(self.config, node_genes=self.parent2.node_genes(), link_genes=[])
+        empty.fitness = 5
+        assert crossover(self.parent1, empty).n_links == 0
+        empty.fitness = -5
+        assert crossover(self.parent1, empty).n_links == 5
+        assert crossover(ArrayGenome.from_genome(self.parent1), ArrayGenome.from_genome(empty)).n_links == 5
@@ -0,0 +1,223 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from neat.cache import FitnessCache
+from neat.config import Config
+from neat.evaluation import AsyncEvaluator, ParallelEvaluator, PopulationEvaluator, pack_genome, unpack_genome
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+from neat.phenome import FeedForwardPhenome
+
+
+def output_sum_fitness(genome):
+    phenome = FeedForwardPhenome(genome, genome.config)
+    return sum(phenome.serial_activate([0.5, -0.25]))
+
+
+class TestPopulationEvaluator(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', activation='sigmoid', idx=3),
+                      NodeGene(node_type='OUTPUT', activation='tanh', idx=4),
+                      NodeGene(node_type='HIDDEN', activation='relu', idx=5),
+                      NodeGene(node_type='HIDDEN', activation='sin', idx=6)]
+        link_genes = [LinkGene(1, 5, weight=0.5),
+                      LinkGene(2, 5, weight=-1.5),
+                      LinkGene(5, 6, weight=2.0),
+                      LinkGene(6, 3, weight=-0.7),
+                      LinkGene(0, 3, weight=0.2),
+                      LinkGene(2, 4, weight=0.9)]
+        deep = Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+        self.genomes = [Genome(self.config), deep, Genome(self.config)]
+        self.inputs = np.random.uniform(-2.0, 2.0, size=(25, 2))
+
+    def test_population_outputs_match_phenomes(self):
+        evaluator = PopulationEvaluator(self.genomes, self.config, chunk_size=10)
+        outputs = evaluator.evaluate(self.inputs)
+        for genome, genome_outputs in zip(self.genomes, outputs):
+            phenome = FeedForwardPhenome(genome, self.config)
+            np.testing.assert_allclose(genome_outputs, phenome.batch_activate(self.inputs))
+
+    def test_population_outputs_have_population_shape(self):
+        outputs = PopulationEvaluator(self.genomes, self.config).evaluate(self.inputs)
+        assert outputs.shape == (3, 25, 2)
+
+    def test_population_evaluator_requires_correct_num_inputs(self):
+        evaluator = PopulationEvaluator(self.genomes, self.config)
+        try:
+            evaluator.evaluate(np.ones((4, 3)))
+            self.fail("Evaluator should raise exception if number of inputs is wrong")
+        except ValueError:
+            pass
+
+
+class TestParallelEvaluator(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.genomes = [Genome(self.config) for _ in range(10)]
+
+    def test_packed_genome_round_trips(self):
+        genome = self.genomes[0]
+        genome.link_genes[0].enabled = False
+        restored = unpack_genome(pack_genome(genome), self.config)
+        assert [(g.idx, g.node_type, g.activation) for g in restored.node_genes()] == \
+            [(g.idx, g.node_type, g.activation) for g in genome.node_genes()]
+        assert [(g.src, g.sink, g.weight, g.enabled, g.innovation_number) for g in restored.link_genes] == \
+            [(g.src, g.sink, g.weight, g.enabled, g.innovation_number) for g in genome.link_genes]
+
+    def test_parallel_fitness_matches_serial_fitness_in_order(self):
+        expected = [output_sum_fitness(genome) for genome in self.genomes]
+        with ParallelEvaluator(output_sum_fitness, self.config, num_workers=2, chunk_size=3) as evaluator:
+            fitnesses = evaluator.evaluate(self.genomes)
+        assert fitnesses == expected
+        assert [genome.fitness for genome in self.genomes] == expected
+
+    def test_parallel_evaluator_reuses_cached_fitness(self):
+        clones = [unpack_genome(pack_genome(genome), self.config) for genome in self.genomes[:4]]
+        cache = FitnessCache()
+        with ParallelEvaluator(output_sum_fitness, self.config, num_workers=2, fitness_cache=cache) as evaluator:
+            expected = evaluator.evaluate(self.genomes)
+            assert evaluator.evaluate(clones) == expected[:4]
+        assert [genome.fitness for genome in clones] == expected[:4]
+        assert (cache.misses, cache.evaluations_saved) == (10, 4)
+
+
+class StubSimulator:
+    """Local socket server that answers each request line with its length after a fixed delay"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        request = await reader.readline()
+        await asyncio.sleep(self.delay)
+        writer.write(b"%d\n" % len(request.strip()))
+        await writer.drain()
+        writer.close()
+
+
+class TestAsyncEvaluator(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.genomes = [Genome(self.config) for _ in range(20)]
+
+    def run_with_simulator(self, delay, evaluator_factory):
+        """Evaluates self.genomes against a stub simulator, returns (fitnesses, seconds)"""
+        async def run():
+            simulator = StubSimulator(delay)
+            port = await simulator.start()
+
+            async def fitness(genome):
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(b"x" * genome.n_links + b"\n")
+                reply = await reader.readline()
+                writer.close()
+                return float(reply)
+
+            start = time.perf_counter()
+            try:
+                fitnesses = await evaluator_factory(fitness).evaluate_async(self.genomes)
+            finally:
+                await simulator.stop()
+            return fitnesses, time.perf_counter() - start
+        return asyncio.run(run())
+
+    def test_async_evaluator_assigns_fitness_in_order(self):
+        fitnesses, _ = self.run_with_simulator(0.0, lambda f: AsyncEvaluator(f, concurrency=4))
+        assert fitnesses == [float(g.n_links) for g in self.genomes]
+        assert [g.fitness for g in self.genomes] == fitnesses
+
+    def test_async_evaluator_overlaps_simulator_calls(self):
+        _, sequential = self.run_with_simulator(0.05, lambda f: AsyncEvaluator(f, concurrency=1))
+        _, concurrent = self.run_with_simulator(0.05, lambda f: AsyncEvaluator(f, concurrency=10))
+        assert concurrent < sequential / 3, "Concurrent %.3f s, sequential %.3f s" % (concurrent, sequential)
+
+    def test_async_evaluator_evaluates_each_network_once(self):
+        evaluated = []
+
+        async def fitness(genome):
+            evaluated.append(genome)
+            return float(genome.n_links)
+
+        genomes = self.genomes[:5] + [unpack_genome(pack_genome(genome), self.config) for genome in self.genomes[:5]]
+        evaluator = AsyncEvaluator(fitness, fitness_cache=FitnessCache())
+        fitnesses = evaluator.evaluate(genomes)
+        assert fitnesses == [float(genome.n_links) for genome in genomes]
+        assert [genome.fitness for genome in genomes] == fitnesses
+        assert evaluated == self.genomes[:5]
+        evaluator.evaluate(genomes)
+        assert len(evaluated) == 5
+
+    def test_async_evaluator_does_not_cache_timeout_fitness(self):
+        cache = FitnessCache()
+
+        async def slow_fitness(genome):
+            await asyncio.sleep(10)
+            return 1.0
+
+        evaluator = AsyncEvaluator(slow_fitness, timeout=0.01, timeout_fitness=-1.0, fitness_cache=cache)
+        assert evaluator.evaluate(self.genomes[:2]) == [-1.0, -1.0]
+        assert len(cache) == 0
+
+    def test_async_evaluator_gives_timeout_fitness(self):
+        async def slow_fitness(genome):
+            await asyncio.sleep(10)
+            return 1.0
+
+        evaluator = AsyncEvaluator(slow_fitness, timeout=0.01, timeout_fitness=-1.0)
+        assert evaluator.evaluate(self.genomes[:3]) == [-1.0, -1.0, -1.0]
+
+    def test_async_evaluator_cancels_remaining_evaluations_on_error(self):
+        started = []
+        cancelled = []
+
+        async def fitness(genome):
+            if genome is self.genomes[0]:
+                raise RuntimeError("simulator failed")
+            started.append(genome)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(genome)
+                raise
+            return 1.0
+
+        try:
+            AsyncEvaluator(fitness, concurrency=5).evaluate(self.genomes)
+            self.fail("Evaluator should propagate fitness errors")
+        except RuntimeError:
+            pass
+        assert len(started) >= 4
+        assert cancelled == started
@@ -16,6 +16,7 @@
 from unittest import TestCase
 
 from neat.genes import NodeGene, LinkGene
+from neat.innovation import InnovationRegistry
 
 
 class TestLinkGene(TestCase):
@@ -29,12 +30,19 @@ class TestLinkGene(TestCase):
             pass
 
     def test_link_gene_increments_innovation_counter(self):
-        link1 = LinkGene(1, 2)
-        link2 = LinkGene(2, 3)
-        link3 = LinkGene(1, 3)
+        registry = InnovationRegistry()
+        link1 = LinkGene(1, 2, registry=registry)
+        link2 = LinkGene(2, 3, registry=registry)
+        link3 = LinkGene(1, 3, registry=registry)
         assert link1.innovation_number + 1 == link2.innovation_number
         assert link2.innovation_number + 1 == link3.innovation_number
 
+    def test_link_gene_reuses_innovation_of_same_link(self):
+        registry = InnovationRegistry()
+        link1 = LinkGene(1, 2, registry=registry)
+        link2 = LinkGene(1, 2, registry=registry)
+        assert link1.innovation_number == link2.innovation_number
+
     def test_link_gene_cannot_be_loop(self):
         try:
             link = LinkGene(1, 1)
@@ -43,6 +51,21 @@ class TestLinkGene(TestCase):
         except ValueError:
             pass
 
+    def test_link_gene_copy(self):
+        link = LinkGene(1, 2, weight=0.5, innov=7, enabled=False)
+        copy = link.copy()
+        assert copy is not link
+        assert (copy.src, copy.sink, copy.weight, copy.innovation_number, copy.enabled) == (1, 2, 0.5, 7, False)
+
+    def test_link_gene_has_no_instance_dict(self):
+        link = LinkGene(1, 2, weight=0.5)
+        assert not hasattr(link, '__dict__')
+        try:
+            link.wieght = 1.0
+            self.fail("Set an attribute outside __slots__")
+        except AttributeError:
+            pass
+
 
 class TestNodeGene(TestCase):
 
@@ -71,12 +94,16 @@ class TestNodeGene(TestCase):
             pass
 
     def test_node_gene_increments_counter(self):
-        gene1 = NodeGene()
-        gene2 = NodeGene()
-        gene3 = NodeGene()
+        registry = InnovationRegistry()
+        gene1 = NodeGene(registry=registry)
+        gene2 = NodeGene(registry=registry)
+        gene3 = NodeGene(registry=registry)
         assert gene1.idx + 1 == gene2.idx
         assert gene2.idx + 1 == gene3.idx
 
     def test_node_gene_has_no_activation_for_input(self):
         gene = NodeGene(activation='sigmoid', node_type='INPUT')
         assert gene.activation is 'identity', "Input node should have identity activation"
+
+    def test_node_gene_has_no_instance_dict(self):
+        assert not hasattr(NodeGene(idx=3), '__dict__')
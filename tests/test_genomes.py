@@ -15,16 +15,20 @@
 
 from unittest import TestCase
 
+import numpy as np
+
+from neat import innovation
 from neat.config import Config
 from neat.genes import NodeGene, LinkGene
-from neat.genome import Genome
+from neat.genome import ArrayGenome, Genome, distance_matrix
+from neat.innovation import InnovationRegistry
+from neat.phenome import FeedForwardPhenome
 
 
 class TestGenome(TestCase):
     def setUp(self):
         self.config = Config('../tests/conf_tester.conf')
-        NodeGene.counter = 1
-        LinkGene.innovation_counter = 0
+        innovation.default_registry = InnovationRegistry()
         self.test_node_genes = [NodeGene(node_type='INPUT',),
                                 NodeGene(node_type='INPUT'),
                                 NodeGene(node_type='OUTPUT'),
@@ -120,3 +124,166 @@ class TestGenome(TestCase):
         except AssertionError:
             pass
 
+    def test_genome_finds_genes_by_index(self):
+        assert self.genome.get_node_by_index(3) is self.test_node_genes[2]
+        assert self.genome.get_link_by_indices(1, 3) is self.test_link_genes[1]
+        assert self.genome.get_link_by_indices(3, 1) is None
+
+    def test_genome_indexes_added_and_removed_genes(self):
+        hidden = NodeGene(node_type='HIDDEN', idx=5)
+        self.genome.add_node_gene(hidden)
+        self.genome.add_link_gene(LinkGene(1, 5))
+        self.genome.add_link_gene(LinkGene(5, 4))
+        assert self.genome.get_node_by_index(5) is hidden
+        assert self.genome.n_links == 4
+
+        self.genome.remove_link_gene(2, 3)
+        assert self.genome.get_link_by_indices(2, 3) is None
+        assert self.genome.n_links == len(self.genome.link_genes) == 3
+
+        self.genome.remove_node_gene(5)
+        assert self.genome.get_node_by_index(5) is None
+        assert self.genome.get_link_by_indices(1, 5) is None
+        assert self.genome.n_links == len(self.genome.link_genes) == 1
+        assert self.genome.hidden_genes == []
+
+    def test_genome_rejects_invalid_added_links(self):
+        for link in [LinkGene(1, 3), LinkGene(3, 1), LinkGene(1, 7)]:
+            try:
+                self.genome.add_link_gene(link)
+                self.fail("Genome should raise exception for invalid link")
+            except ValueError:
+                pass
+
+    def test_genome_rejects_repeated_link(self):
+        link_tester = [LinkGene(1, 3), LinkGene(2, 4), LinkGene(1, 3)]
+        try:
+            Genome(self.config, node_genes=self.test_node_genes, link_genes=link_tester)
+        except AssertionError:
+            return
+        self.fail("Genome should raise exception if duplicate links exist")
+
+    def test_genome_allows_links_in_both_directions(self):
+        link_tester = [LinkGene(3, 4), LinkGene(4, 3)]
+        genome = Genome(self.config, node_genes=self.test_node_genes, link_genes=link_tester)
+        assert genome.n_links == 2
+
+    def test_genome_from_validated_matches_constructor(self):
+        genome = Genome.from_validated(self.config, self.test_node_genes, self.test_link_genes)
+        assert [g.idx for g in genome.node_genes()] == [g.idx for g in self.genome.node_genes()]
+        assert genome.link_genes == self.genome.link_genes
+        assert genome.get_link_by_indices(2, 3) is self.test_link_genes[0]
+        assert genome.distance(self.genome) == 0
+
+    def test_genome_keeps_links_sorted_by_innovation(self):
+        genome = Genome(self.config, node_genes=self.test_node_genes,
+                        link_genes=[LinkGene(1, 3, innov=5), LinkGene(2, 4, innov=2)])
+        genome.add_link_gene(LinkGene(1, 4, innov=3))
+        assert [g.innovation_number for g in genome.link_genes] == [2, 3, 5]
+
+    def test_distance_matrix_matches_pairwise_distances(self):
+        genomes = [self.genome, Genome(self.config), Genome(self.config)]
+        variant = Genome(self.config, node_genes=[NodeGene(node_type='INPUT', idx=1),
+                                                  NodeGene(node_type='INPUT', idx=2),
+                                                  NodeGene(node_type='OUTPUT', idx=3, activation='relu'),
+                                                  NodeGene(node_type='OUTPUT', idx=4),
+                                                  NodeGene(node_type='HIDDEN', idx=5)],
+                         link_genes=[LinkGene(2, 3, weight=0.5, innov=self.test_link_genes[0].innovation_number),
+                                     LinkGene(1, 5, enabled=False), LinkGene(5, 4)])
+        genomes.append(variant)
+        genomes.append(Genome(self.config, node_genes=self.test_node_genes, link_genes=[]))
+        matrix = distance_matrix(genomes)
+        expected = np.array([[g1.distance(g2) for g2 in genomes] for g1 in genomes])
+        np.testing.assert_allclose(matrix, expected)
+
+
+class TestArrayGenome(TestCase):
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        innovation.default_registry = InnovationRegistry()
+        self.test_node_genes = [NodeGene(node_type='INPUT', idx=1),
+                                NodeGene(node_type='INPUT', idx=2),
+                                NodeGene(node_type='OUTPUT', idx=3),
+                                NodeGene(node_type='OUTPUT', idx=4),
+                                NodeGene(node_type='HIDDEN', idx=5)]
+        self.test_link_genes = [LinkGene(1, 5, weight=0.5, innov=4), LinkGene(2, 3, weight=1, innov=1),
+                                LinkGene(5, 4, weight=-2, innov=7, enabled=False), LinkGene(0, 3, weight=0.1, innov=2)]
+        self.genome = Genome(self.config, node_genes=self.test_node_genes, link_genes=self.test_link_genes)
+        self.array_genome = ArrayGenome(self.config, node_genes=self.test_node_genes,
+                                        link_genes=self.test_link_genes)
+
+    def test_array_genome_matches_genome(self):
+        fields = lambda genome: [(g.src, g.sink, g.weight, g.enabled, g.innovation_number)
+                                 for g in genome.link_genes]
+        assert fields(self.array_genome) == fields(self.genome)
+        assert self.array_genome.n_links == 4
+        assert self.array_genome.size() == self.genome.size() == (1, 3)
+        assert self.array_genome.distance(self.genome) == 0
+        assert self.genome.distance(self.array_genome) == 0
+        assert fields(self.array_genome.to_genome()) == fields(self.genome)
+        assert fields(ArrayGenome.from_genome(self.genome)) == fields(self.genome)
+
+    def test_array_genome_distance_matches_genome(self):
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', idx=3),
+                      NodeGene(node_type='OUTPUT', idx=4),
+                      NodeGene(node_type='HIDDEN', idx=5, activation='relu'),
+                      NodeGene(node_type='HIDDEN', idx=6)]
+        link_genes = [LinkGene(1, 5, weight=-0.5, innov=4), LinkGene(2, 3, weight=1, innov=1, enabled=False),
+                      LinkGene(5, 4, weight=3, innov=7), LinkGene(1, 6, weight=0.3, innov=3),
+                      LinkGene(6, 3, weight=0.7, innov=5), LinkGene(2, 6, weight=-1, innov=9, enabled=False)]
+        other = Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+        array_other = ArrayGenome.from_genome(other)
+        for first, second in [(self.genome, other), (other, self.genome)]:
+            expected = first.distance(second)
+            assert expected > 0
+            self.assertAlmostEqual(ArrayGenome.from_genome(first).distance(ArrayGenome.from_genome(second)), expected)
+            self.assertAlmostEqual(ArrayGenome.from_genome(first).distance(second), expected)
+        unlinked = Genome(self.config, node_genes=node_genes[:4], link_genes=[])
+        self.assertAlmostEqual(array_other.distance(ArrayGenome.from_genome(unlinked)), other.distance(unlinked))
+
+    def test_array_genome_validates(self):
+        try:
+            ArrayGenome(self.config, node_genes=self.test_node_genes, link_genes=[LinkGene(1, 9)])
+            self.fail("Link to missing node")
+        except ValueError:
+            pass
+
+    def test_array_genome_phenome_matches_genome(self):
+        inputs = [0.3, -0.7]
+        assert (FeedForwardPhenome(self.array_genome, self.config).serial_activate(inputs) ==
+                FeedForwardPhenome(self.genome, self.config).serial_activate(inputs))
+
+    def test_array_genome_link_views_write_through(self):
+        link = self.array_genome.get_link_by_indices(5, 4)
+        assert link.innovation_number == 7
+        link.weight = 3.0
+        link.enabled = True
+        assert self.array_genome.link_weight[-1] == 3.0
+        assert self.array_genome.size() == (1, 4)
+        assert self.array_genome.get_link_by_indices(4, 5) is None
+
+    def test_array_genome_adds_and_removes_genes(self):
+        self.array_genome.add_link_gene(LinkGene(2, 5, weight=0.25, innov=3))
+        assert list(self.array_genome.link_innovation) == [1, 2, 3, 4, 7]
+        assert self.array_genome.get_link_by_indices(2, 5).weight == 0.25
+        try:
+            self.array_genome.add_link_gene(LinkGene(2, 5, innov=8))
+            self.fail("Added repeated link")
+        except ValueError:
+            pass
+
+        removed = self.array_genome.remove_link_gene(2, 3)
+        assert (removed.src, removed.sink, removed.innovation_number) == (2, 3, 1)
+        assert self.array_genome.get_link_by_indices(2, 3) is None
+
+        self.array_genome.remove_node_gene(5)
+        assert self.array_genome.hidden_genes == []
+        assert [(g.src, g.sink) for g in self.array_genome.link_genes] == [(0, 3)]
+
+    def test_array_genome_from_arrays_sorts_by_innovation(self):
+        genome = ArrayGenome.from_arrays(self.config, self.test_node_genes, [1, 2], [5, 3], [0.5, 1.0],
+                                         [True, True], [9, 4])
+        assert [g.innovation_number for g in genome.link_genes] == [4, 9]
+        assert genome.get_link_by_indices(1, 5).weight == 0.5
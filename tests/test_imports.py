@@ -0,0 +1,51 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous bound on the cumulative import time of neat.phenome; NumPy alone takes
+# around 0.1 s, while pulling in matplotlib and networkx adds several times that.
+IMPORT_BUDGET_US = 1000000
+
+
+def import_times(module):
+    """Runs python -X importtime for module, returns {module name: cumulative microseconds}"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                            cwd=REPO_ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImports(TestCase):
+
+    def test_phenome_import_skips_plotting_libraries(self):
+        times = import_times('neat.phenome')
+        for name in times:
+            assert not name.startswith(('networkx', 'matplotlib')), "neat.phenome imported %s" % name
+
+    def test_phenome_import_time_within_budget(self):
+        times = import_times('neat.phenome')
+        assert times['neat.phenome'] < IMPORT_BUDGET_US, \
+            "Importing neat.phenome took %.0f ms" % (times['neat.phenome'] / 1000)
@@ -0,0 +1,114 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+from unittest import TestCase
+
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+from neat.innovation import InnovationRegistry, remap_genome
+
+
+class TestInnovationRegistry(TestCase):
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.registry = InnovationRegistry()
+
+    def test_registry_reuses_numbers_within_generation(self):
+        innov = self.registry.get_link_innovation(1, 3)
+        assert self.registry.get_link_innovation(2, 3) == innov + 1
+        assert self.registry.get_link_innovation(1, 3) == innov
+        split = self.registry.get_split_node_id(1, 3)
+        assert self.registry.get_split_node_id(1, 3) == split
+        assert self.registry.new_node_id() == split + 1
+
+        self.registry.new_generation()
+        assert self.registry.get_link_innovation(1, 3) == innov + 2
+        assert self.registry.get_split_node_id(1, 3) == split + 2
+
+    def test_random_genomes_share_innovations(self):
+        genome1 = Genome(self.config, registry=self.registry)
+        genome2 = Genome(self.config, registry=self.registry)
+        assert ([g.innovation_number for g in genome1.link_genes] ==
+                [g.innovation_number for g in genome2.link_genes])
+        assert [g.idx for g in genome1.node_genes()] == [1, 2, 3, 4]
+        assert self.registry.new_node_id() == 5
+
+    def test_genome_does_not_reset_node_ids(self):
+        NodeGene(registry=self.registry)
+        Genome(self.config, registry=self.registry)
+        assert NodeGene(registry=self.registry).idx == 5
+
+    def test_registry_from_genomes_numbers_above_genes(self):
+        genome = Genome(self.config, node_genes=[NodeGene(node_type='INPUT', idx=1),
+                                                 NodeGene(node_type='INPUT', idx=2),
+                                                 NodeGene(node_type='OUTPUT', idx=3),
+                                                 NodeGene(node_type='OUTPUT', idx=9)],
+                        link_genes=[LinkGene(1, 9, innov=41)])
+        registry = InnovationRegistry.from_genomes([genome])
+        assert registry.new_node_id() == 10
+        assert registry.get_link_innovation(1, 3) == 42
+
+    def test_merge_renumbers_worker_genes(self):
+        self.registry.get_link_innovation(1, 3)
+        worker1 = pickle.loads(pickle.dumps(self.registry.fork()))
+        worker2 = pickle.loads(pickle.dumps(self.registry.fork()))
+
+        # Both workers split 1 -> 3 and link the new node to 4; only worker2 adds 2 -> 4
+        assert worker1.get_link_innovation(1, 3) == 0
+        node1 = worker1.get_split_node_id(1, 3)
+        link1 = worker1.get_link_innovation(node1, 4)
+        worker2.get_link_innovation(2, 4)
+        node2 = worker2.get_split_node_id(1, 3)
+        link2 = worker2.get_link_innovation(node2, 4)
+        assert link1 != link2
+
+        node_map1, innovation_map1 = self.registry.merge(worker1)
+        node_map2, innovation_map2 = self.registry.merge(worker2)
+        assert node_map1[node1] == node_map2[node2]
+        assert innovation_map1[link1] == innovation_map2[link2]
+        assert len(set(innovation_map2.values())) == 2
+
+    def test_merge_rejects_unforked_registry(self):
+        try:
+            self.registry.merge(InnovationRegistry())
+            self.fail("Merged a registry that was not forked")
+        except ValueError:
+            pass
+
+    def test_remap_genome(self):
+        Genome(self.config, registry=self.registry)
+        worker = self.registry.fork()
+        genome = Genome(self.config, registry=worker)
+        hidden = NodeGene(idx=worker.get_split_node_id(1, 3))
+        genome.add_node_gene(hidden)
+        genome.add_link_gene(LinkGene(1, hidden.idx, registry=worker))
+        # The run hands out the same numbers meanwhile
+        assert self.registry.new_node_id() == hidden.idx
+        self.registry.get_link_innovation(4, 5)
+
+        node_map, innovation_map = self.registry.merge(worker)
+        remapped = remap_genome(genome, node_map, innovation_map)
+        assert [g.idx for g in remapped.hidden_genes] == [node_map[hidden.idx]]
+        assert remapped.get_link_by_indices(1, node_map[hidden.idx]) is not None
+        assert remapped.get_link_by_indices(1, 3).innovation_number == self.registry.get_link_innovation(1, 3)
+        assert remapped.distance(genome) > 0
+
+    def test_merge_keeps_reserved_node_ids(self):
+        worker = self.registry.fork()
+        Genome(self.config, registry=worker)
+        self.registry.merge(worker)
+        assert self.registry.new_node_id() == 5
@@ -0,0 +1,136 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+import numpy as np
+
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import ArrayGenome, Genome
+from neat.innovation import InnovationRegistry
+from neat.mutation import (creates_cycle, mutate_add_link, mutate_add_node, mutate_delete_link,
+                           mutate_delete_node, mutate_population, mutate_weights)
+from neat.phenome import FeedForwardPhenome
+
+
+class CountingGenerator:
+    """numpy Generator recording how many calls draw random numbers"""
+    def __init__(self, seed):
+        self.generator = np.random.default_rng(seed)
+        self.calls = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.generator, name)
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return method(*args, **kwargs)
+        return counted
+
+
+class TestMutation(TestCase):
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.config.num_inputs = 5
+        self.config.num_outputs = 3
+        self.registry = InnovationRegistry()
+        self.genomes = [Genome(self.config, registry=self.registry) for _ in range(20)]
+
+    def test_mutate_weights_draws_once_per_step_for_population(self):
+        rng = CountingGenerator(1)
+        mutate_weights(self.genomes, self.config, rng)
+        assert rng.calls == 3
+
+    def test_mutate_weights_perturbs_expected_fraction(self):
+        self.config.prob_mutate_weight = 0.5
+        self.config.prob_toggle_link = 0.1
+        genomes = [Genome(self.config, registry=self.registry) for _ in range(200)]
+        before = np.array([[g.weight for g in genome.link_genes] for genome in genomes])
+        mutate_weights(genomes, self.config, np.random.default_rng(2))
+        after = np.array([[g.weight for g in genome.link_genes] for genome in genomes])
+        enabled = np.array([[g.enabled for g in genome.link_genes] for genome in genomes])
+        assert 0.45 < np.mean(before != after) < 0.55
+        assert 0.08 < np.mean(~enabled) < 0.12
+
+    def test_mutate_weights_matches_for_array_genomes(self):
+        array_genomes = [ArrayGenome.from_genome(genome) for genome in self.genomes]
+        mutate_weights(self.genomes, self.config, np.random.default_rng(3))
+        mutate_weights(array_genomes, self.config, np.random.default_rng(3))
+        for genome, array_genome in zip(self.genomes, array_genomes):
+            np.testing.assert_array_equal(array_genome.link_weight, [g.weight for g in genome.link_genes])
+            np.testing.assert_array_equal(array_genome.link_enabled, [g.enabled for g in genome.link_genes])
+
+    def test_mutate_add_node_splits_link(self):
+        genome = self.genomes[0]
+        rng = np.random.default_rng(4)
+        node = mutate_add_node(genome, self.config, self.registry, rng)
+        assert genome.hidden_genes == [node]
+        into = [g for g in genome.link_genes if g.sink == node.idx]
+        out = [g for g in genome.link_genes if g.src == node.idx]
+        assert len(into) == len(out) == 1
+        split = genome.get_link_by_indices(into[0].src, out[0].sink)
+        assert not split.enabled
+        assert into[0].weight == 1.0 and out[0].weight == split.weight
+
+        # The same split elsewhere this generation reuses the numbers
+        other = self.genomes[1]
+        other.get_link_by_indices(into[0].src, out[0].sink).enabled = False
+        for gene in other.link_genes:
+            gene.enabled = (gene.src, gene.sink) == (into[0].src, out[0].sink)
+        assert mutate_add_node(other, self.config, self.registry, rng).idx == node.idx
+        assert other.get_link_by_indices(node.idx, out[0].sink).innovation_number == out[0].innovation_number
+
+    def test_mutate_add_link_keeps_network_feed_forward(self):
+        nodes = [NodeGene(node_type='INPUT', idx=1), NodeGene(node_type='OUTPUT', idx=2),
+                 NodeGene(node_type='HIDDEN', idx=3), NodeGene(node_type='HIDDEN', idx=4)]
+        self.config.num_inputs = 1
+        self.config.num_outputs = 1
+        genome = Genome(self.config, node_genes=nodes,
+                        link_genes=[LinkGene(1, 3, registry=self.registry), LinkGene(3, 4, registry=self.registry),
+                                    LinkGene(4, 2, registry=self.registry)])
+        assert creates_cycle(genome, 4, 3)
+        assert not creates_cycle(genome, 3, 2)
+        rng = np.random.default_rng(5)
+        while mutate_add_link(genome, self.registry, rng) is not None:
+            pass
+        phenome = FeedForwardPhenome(genome, self.config)
+        assert sum(len(layer) for layer in phenome.layers) == 3
+
+    def test_mutate_delete(self):
+        genome = self.genomes[0]
+        rng = np.random.default_rng(6)
+        assert mutate_delete_node(genome, rng) is None
+        mutate_add_node(genome, self.config, self.registry, rng)
+        n_links = genome.n_links
+        mutate_delete_link(genome, rng)
+        assert genome.n_links == n_links - 1
+        mutate_delete_node(genome, rng)
+        assert genome.hidden_genes == []
+
+    def test_mutate_population_keeps_genomes_valid(self):
+        self.config.prob_add_node = 0.5
+        self.config.prob_add_conn = 0.5
+        self.config.multiple_mutations = True
+        genomes = self.genomes + [ArrayGenome.from_genome(Genome(self.config, registry=self.registry))]
+        rng = np.random.default_rng(7)
+        for _ in range(10):
+            self.registry.new_generation()
+            mutate_population(genomes, self.config, self.registry, rng)
+        for genome in genomes:
+            copy = Genome(self.config, node_genes=genome.node_genes(),
+                          link_genes=[LinkGene(g.src, g.sink, weight=g.weight, innov=g.innovation_number)
+                                      for g in genome.link_genes])
+            assert len(FeedForwardPhenome(copy, self.config).serial_activate([1.0] * 5)) == 3
@@ -13,20 +13,47 @@
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import gc
+import itertools
+import pickle
+import weakref
 from unittest import TestCase
 from nose.plugins.attrib import attr
 
+import numpy as np
+
+from neat import innovation
 from neat.config import Config
 from neat.genes import NodeGene, LinkGene
-from neat.genome import Genome
-from neat.phenome import FeedForwardPhenome
+from neat.genome import ArrayGenome, Genome
+from neat.innovation import InnovationRegistry
+from neat.phenome import FeedForwardPhenome, RecurrentPhenome, find_feed_forward_layers
+
+
+class TestFindFeedForwardLayers(TestCase):
+
+    def test_layers_follow_longest_path_from_inputs(self):
+        connections = [(1, 5), (2, 5), (5, 6), (1, 6), (6, 3), (0, 3), (2, 4)]
+        layers = find_feed_forward_layers([1, 2], connections)
+        assert layers == [{4, 5}, {6}, {3}], "Got layers %s" % layers
+
+    def test_nodes_on_cycles_are_omitted(self):
+        connections = [(1, 5), (5, 6), (6, 5), (2, 3), (6, 4)]
+        layers = find_feed_forward_layers([1, 2], connections)
+        assert layers == [{3}], "Got layers %s" % layers
+
+    def test_nodes_not_feeding_outputs_are_pruned(self):
+        connections = [(1, 5), (5, 3), (2, 6), (6, 7), (1, 4)]
+        assert find_feed_forward_layers([1, 2], connections) == [{4, 5, 6}, {3, 7}]
+        layers = find_feed_forward_layers([1, 2], connections, [3, 4])
+        assert layers == [{4, 5}, {3}], "Got layers %s" % layers
 
 
 class TestPhenome(TestCase):
 
     def setUp(self):
         self.config = Config('../tests/conf_tester.conf')
-        NodeGene.counter = 1
+        innovation.default_registry = InnovationRegistry()
         self.test_node_genes = [NodeGene(node_type='INPUT', activation='identity'),
                                 NodeGene(node_type='INPUT', activation='identity'),
                                 NodeGene(node_type='OUTPUT', activation='identity'),
@@ -55,6 +82,88 @@ class TestPhenome(TestCase):
         outputs = self.phenome.serial_activate([1.0, 1.0])
         assert len(outputs) == len(self.genome.output_genes)
 
+    def test_batch_activate_matches_serial_activate(self):
+        innovation.default_registry = InnovationRegistry()
+        node_genes = [NodeGene(node_type='INPUT'),
+                      NodeGene(node_type='INPUT'),
+                      NodeGene(node_type='OUTPUT', activation='sigmoid'),
+                      NodeGene(node_type='OUTPUT', activation='tanh'),
+                      NodeGene(node_type='HIDDEN', activation='relu'),
+                      NodeGene(node_type='HIDDEN', activation='gauss')]
+        link_genes = [LinkGene(1, 5, weight=0.5),
+                      LinkGene(2, 5, weight=-1.5),
+                      LinkGene(0, 6, weight=0.3),
+                      LinkGene(5, 6, weight=2.0),
+                      LinkGene(6, 3, weight=-0.7),
+                      LinkGene(1, 3, weight=1.1),
+                      LinkGene(5, 4, weight=0.9),
+                      LinkGene(2, 4, weight=0.4, enabled=False)]
+        genome = Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+        phenome = FeedForwardPhenome(genome, self.config)
+        inputs = np.random.uniform(-3.0, 3.0, size=(50, 2))
+        expected = np.array([phenome.serial_activate(row) for row in inputs])
+        np.testing.assert_allclose(phenome.batch_activate(inputs), expected)
+
+    def test_batch_activate_returns_one_row_per_sample(self):
+        outputs = self.phenome.batch_activate(np.ones((7, 2)))
+        assert outputs.shape == (7, 2)
+        np.testing.assert_allclose(outputs, 3.0)
+
+    def test_batch_activate_requires_correct_num_inputs(self):
+        try:
+            self.phenome.batch_activate(np.ones((7, 3)))
+            self.fail("Phenome should raise exception if number of inputs is wrong")
+        except ValueError:
+            pass
+
+    def test_phenome_numbers_nodes_densely(self):
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', activation='identity', idx=3),
+                      NodeGene(node_type='OUTPUT', activation='identity', idx=4),
+                      NodeGene(node_type='HIDDEN', activation='identity', idx=1000)]
+        link_genes = [LinkGene(1, 1000, weight=2.0),
+                      LinkGene(1000, 3, weight=1.0),
+                      LinkGene(2, 3, weight=1.0)]
+        genome = Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+        phenome = FeedForwardPhenome(genome, self.config)
+        assert phenome.node_order.tolist() == [0, 1, 2, 1000, 3, 4]
+        assert phenome.indptr[-1] == len(phenome.src) == len(phenome.weight) == 3
+        assert phenome.serial_activate([1.0, 1.0]) == [3.0, 0.0]
+
+    def test_phenome_survives_pickling(self):
+        self.phenome.batch_activate(np.ones((2, 2)))
+        phenome = pickle.loads(pickle.dumps(self.phenome))
+        assert phenome.serial_activate([1.0, 2.0]) == self.phenome.serial_activate([1.0, 2.0])
+
+    def test_phenome_builds_graph_only_on_access(self):
+        assert self.phenome._graph is None
+        graph = self.phenome.graph
+        assert sorted(graph.nodes()) == [0, 1, 2, 3, 4]
+        assert graph.number_of_edges() == len(self.test_link_genes)
+        assert self.phenome.graph is graph
+
+    def test_graph_shows_links_as_compiled(self):
+        for gene in self.genome.link_genes:
+            gene.weight = 5.0
+        self.genome.link_genes[0].enabled = False
+        assert {(src, sink): data['weight'] for src, sink, data in self.phenome.graph.edges(data=True)} == \
+            {(g.src, g.sink): 1 for g in self.test_link_genes}
+        assert all(data['enabled'] for _, _, data in self.phenome.graph.edges(data=True))
+
+    def test_phenome_keeps_no_reference_to_genome(self):
+        genome = ArrayGenome.from_genome(self.genome)
+        phenome = FeedForwardPhenome(genome, self.config)
+        ref = weakref.ref(genome)
+        del genome
+        gc.collect()
+        assert ref() is None
+        assert phenome.graph.number_of_edges() == len(self.test_link_genes)
+
+    def test_unpickled_phenome_builds_graph(self):
+        phenome = pickle.loads(pickle.dumps(self.phenome))
+        assert sorted(phenome.graph.edges()) == sorted(self.phenome.links)
+
     @attr('draw')
     def test_draw_premade_phenome(self):
         self.phenome.draw(testing=True)
@@ -68,3 +177,60 @@ class TestPhenome(TestCase):
         self.config.num_inputs = 2
         self.config.num_outputs = 2
         phenome.draw(testing=True)
+
+
+class TestRecurrentPhenome(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', activation='identity', idx=3),
+                      NodeGene(node_type='OUTPUT', activation='identity', idx=4),
+                      NodeGene(node_type='HIDDEN', activation='identity', idx=5)]
+        link_genes = [LinkGene(1, 5, weight=1.0),
+                      LinkGene(5, 3, weight=1.0),
+                      LinkGene(3, 5, weight=1.0),
+                      LinkGene(2, 4, weight=2.0)]
+        self.genome = Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+
+    def test_recurrent_phenome_carries_state_between_steps(self):
+        phenome = RecurrentPhenome(self.genome, self.config)
+        outputs = [phenome.step([1.0, 1.0]).tolist() for _ in range(5)]
+        assert outputs == [[0.0, 2.0], [1.0, 2.0], [1.0, 2.0], [2.0, 2.0], [2.0, 2.0]], "Got %s" % outputs
+
+    def test_recurrent_phenome_reset_clears_state(self):
+        phenome = RecurrentPhenome(self.genome, self.config)
+        first = [phenome.step([1.0, 0.5]).tolist() for _ in range(3)]
+        phenome.reset()
+        assert [phenome.step([1.0, 0.5]).tolist() for _ in range(3)] == first
+
+    def test_recurrent_phenome_reset_keeps_batch_size(self):
+        phenome = RecurrentPhenome(self.genome, self.config, batch_size=4)
+        first = phenome.step(np.ones((4, 2)))
+        phenome.reset()
+        np.testing.assert_array_equal(phenome.step(np.ones((4, 2))), first)
+        phenome.reset(None)
+        assert phenome.step([1.0, 1.0]).shape == (2,)
+
+    def test_recurrent_phenome_batch_matches_single_episodes(self):
+        sequences = np.random.uniform(-1.0, 1.0, size=(4, 6, 2))
+        batched = RecurrentPhenome(self.genome, self.config, batch_size=4)
+        outputs = np.array(list(batched.run(sequences.transpose(1, 0, 2))))
+        single = RecurrentPhenome(self.genome, self.config)
+        for episode, sequence in enumerate(sequences):
+            single.reset()
+            np.testing.assert_allclose(outputs[:, episode], np.array(list(single.run(sequence))))
+
+    def test_recurrent_phenome_runs_unbounded_sequences_lazily(self):
+        phenome = RecurrentPhenome(self.genome, self.config)
+        outputs = list(itertools.islice(phenome.run(itertools.repeat([1.0, 1.0])), 3))
+        assert len(outputs) == 3
+
+    def test_recurrent_phenome_requires_correct_input_shape(self):
+        phenome = RecurrentPhenome(self.genome, self.config, batch_size=3)
+        try:
+            phenome.step([1.0, 1.0])
+            self.fail("Phenome should raise exception if inputs are not batched")
+        except ValueError:
+            pass
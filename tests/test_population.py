@@ -0,0 +1,72 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+import numpy as np
+
+from neat.config import Config
+from neat.genes import LinkGene
+from neat.genome import Genome
+from neat.innovation import InnovationRegistry
+from neat.mutation import mutate_add_node, mutate_weights
+from neat.phenome import FeedForwardPhenome
+from neat.population import Population
+
+
+class TestPopulation(TestCase):
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.config.num_inputs = 3
+        self.registry = InnovationRegistry()
+        self.population = Population.initialize(self.config, registry=self.registry, rng=np.random.default_rng(0))
+
+    def test_initialize_builds_genomes_lazily(self):
+        assert len(self.population) == self.config.pop_size
+        assert self.population.n_materialized == 0
+        genome = self.population[3]
+        assert self.population[3] is genome
+        assert self.population.n_materialized == 1
+        assert len(self.population.genomes()) == self.population.n_materialized == self.config.pop_size
+
+    def test_initial_genomes_match_random_genome(self):
+        expected = Genome(self.config, registry=self.registry)
+        for genome in [self.population[0], self.population[-1]]:
+            assert [g.idx for g in genome.node_genes()] == [g.idx for g in expected.node_genes()]
+            assert ([(g.src, g.sink, g.innovation_number, g.enabled) for g in genome.link_genes] ==
+                    [(g.src, g.sink, g.innovation_number, g.enabled) for g in expected.link_genes])
+        phenome = FeedForwardPhenome(self.population[0], self.config)
+        assert len(phenome.serial_activate([1.0, 0.5, -1.0])) == 2
+
+    def test_initial_weights_come_from_one_matrix(self):
+        weights = self.population.weights
+        assert weights.shape == (self.config.pop_size, 8)
+        assert 0.0 <= weights.min() and weights.max() < 1.0
+        np.testing.assert_array_equal(self.population[5].link_weight, weights[5])
+        assert not np.array_equal(weights[0], weights[1])
+
+    def test_genomes_share_topology_but_not_weights(self):
+        genome1, genome2 = self.population[0], self.population[1]
+        assert genome1.link_src is genome2.link_src
+        assert genome1.node_genes()[0] is genome2.node_genes()[0]
+
+        mutate_weights([genome1], self.config, np.random.default_rng(1))
+        np.testing.assert_array_equal(self.population.weights[0], genome1.link_weight)
+        assert genome2.link_weight[0] == self.population.weights[1, 0]
+
+        mutate_add_node(genome1, self.config, self.registry, np.random.default_rng(2))
+        genome1.add_link_gene(LinkGene(1, genome1.hidden_genes[0].idx, innov=100))
+        assert genome2.n_links == 8 and genome2.hidden_genes == []
+        assert len(self.population[2].link_src) == 8
@@ -0,0 +1,117 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from neat import reporting
+from neat.config import Config
+from neat.evaluation import PopulationEvaluator
+from neat.genome import Genome
+from neat.innovation import InnovationRegistry
+from neat.reporting import Instrumentation, JSONLinesReporter, ProfileReporter, Reporter
+from neat.species import SpeciesSet
+
+
+class RecordingReporter(Reporter):
+    def __init__(self):
+        self.events = []
+
+    def start_generation(self, generation):
+        self.events.append(('start', generation))
+
+    def end_generation(self, report):
+        self.events.append(('end', report.generation))
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        registry = InnovationRegistry()
+        self.genomes = [Genome(self.config, registry=registry) for _ in range(5)]
+
+    def run_generation(self):
+        evaluator = PopulationEvaluator(self.genomes, self.config)
+        evaluator.evaluate(np.ones((3, 2)))
+        SpeciesSet(self.config).speciate(self.genomes, 0)
+
+    def test_instrumentation_is_off_outside_generation(self):
+        assert reporting.span('evaluation') is reporting.span('speciation')
+        reporting.count('phenomes_built')
+        self.run_generation()
+        assert reporting._active is None
+
+    def test_generation_collects_spans_and_counters(self):
+        reporter = RecordingReporter()
+        instrumentation = Instrumentation([reporter])
+        for generation in range(2):
+            with instrumentation.generation(generation):
+                self.run_generation()
+                with reporting.span('reproduction'):
+                    reporting.count('offspring', 3)
+        assert reporter.events == [('start', 0), ('end', 0), ('start', 1), ('end', 1)]
+        report = instrumentation.reports[-1]
+        assert set(report.spans) == {'phenome_building', 'evaluation', 'speciation', 'reproduction'}
+        assert report.counters['phenomes_built'] == 5
+        assert report.counters['offspring'] == 3
+        assert report.counters['distance_calls'] >= 4
+        assert 'distance_cache_hits' in report.counters
+        assert report.seconds >= sum(report.spans.values())
+        assert reporting._active is None
+
+    def test_generations_do_not_nest(self):
+        instrumentation = Instrumentation()
+        with instrumentation.generation(0):
+            try:
+                with instrumentation.generation(1):
+                    pass
+                self.fail("Nested generations")
+            except RuntimeError:
+                pass
+        assert instrumentation.reports[-1].generation == 0
+
+    def test_json_lines_reporter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'run.jsonl')
+            instrumentation = Instrumentation([JSONLinesReporter(filename)])
+            for generation in range(3):
+                with instrumentation.generation(generation):
+                    self.run_generation()
+            instrumentation.close()
+            with open(filename) as f:
+                lines = [json.loads(line) for line in f]
+        assert [line['generation'] for line in lines] == [0, 1, 2]
+        assert lines[0]['counters']['phenomes_built'] == 5
+        assert 'evaluation' in lines[0]['spans']
+
+    def test_profile_reporter_profiles_one_generation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'gen1.prof')
+            profiler = ProfileReporter(1, filename)
+            instrumentation = Instrumentation([profiler])
+            with instrumentation.generation(0):
+                self.run_generation()
+            assert profiler.stats is None
+            with instrumentation.generation(1):
+                self.run_generation()
+            with instrumentation.generation(2):
+                pass
+            assert os.path.isfile(filename)
+        functions = {name for _, _, name in profiler.stats.stats}
+        assert 'speciate' in functions and '_pack' in functions
@@ -0,0 +1,78 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+from neat.serialization import load_population, save_population
+
+
+def genome_signature(genome):
+    nodes = [(g.idx, g.node_type, g.activation) for g in genome.node_genes()]
+    links = [(g.src, g.sink, g.weight, g.enabled, g.innovation_number) for g in genome.link_genes]
+    return nodes, links, genome.fitness
+
+
+class TestSerialization(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.genomes = [Genome(self.config) for _ in range(5)]
+        hidden = Genome(self.config, node_genes=[NodeGene(node_type='INPUT', idx=1),
+                                                 NodeGene(node_type='INPUT', idx=2),
+                                                 NodeGene(node_type='OUTPUT', idx=3, activation='tanh'),
+                                                 NodeGene(node_type='OUTPUT', idx=4),
+                                                 NodeGene(node_type='HIDDEN', idx=9, activation='relu')],
+                        link_genes=[LinkGene(1, 9, weight=0.25), LinkGene(9, 3, enabled=False)])
+        self.genomes.insert(2, hidden)
+        for i, genome in enumerate(self.genomes):
+            genome.fitness = 1.5 * i
+        fd, self.filename = tempfile.mkstemp(suffix='.pop')
+        os.close(fd)
+        save_population(self.filename, self.genomes)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_population_round_trips(self):
+        population = load_population(self.filename, self.config)
+        assert len(population) == len(self.genomes)
+        assert [genome_signature(g) for g in population] == [genome_signature(g) for g in self.genomes]
+
+    def test_population_file_is_memory_mapped(self):
+        population = load_population(self.filename, self.config)
+        assert isinstance(population.links, np.memmap)
+        assert isinstance(population.nodes, np.memmap)
+
+    def test_single_genome_is_rebuilt_on_demand(self):
+        population = load_population(self.filename, self.config)
+        assert genome_signature(population[2]) == genome_signature(self.genomes[2])
+        assert genome_signature(population[-1]) == genome_signature(self.genomes[-1])
+        assert population[2].get_link_by_indices(1, 9).weight == 0.25
+
+    def test_loading_rejects_other_files(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'not a population file at all, no')
+        try:
+            load_population(self.filename, self.config)
+            self.fail("Loading should fail for files without the population header")
+        except ValueError:
+            pass
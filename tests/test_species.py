@@ -0,0 +1,87 @@
+# Copyright (C) 2016  William Langhoff WildBill567@users.noreply.github.com
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+from neat.cache import LRUCache
+from neat.config import Config
+from neat.genes import NodeGene, LinkGene
+from neat.genome import Genome
+from neat.species import SpeciesSet
+
+
+class TestLRUCache(TestCase):
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        assert 'a' in cache and 'c' in cache and 'b' not in cache
+        assert len(cache) == 2
+
+    def test_cache_counts_hits_and_misses(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert (cache.hits, cache.misses, cache.hit_rate) == (1, 1, 0.5)
+
+
+class TestSpeciesSet(TestCase):
+
+    def setUp(self):
+        self.config = Config('../tests/conf_tester.conf')
+        self.config.compatibility_threshold = 1.0
+        self.genomes = [self.make_genome(w) for w in (0.0, 0.1, 0.2, 10.0, 10.1, 20.0)]
+
+    def make_genome(self, weight):
+        node_genes = [NodeGene(node_type='INPUT', idx=1),
+                      NodeGene(node_type='INPUT', idx=2),
+                      NodeGene(node_type='OUTPUT', idx=3),
+                      NodeGene(node_type='OUTPUT', idx=4)]
+        link_genes = [LinkGene(1, 3, weight=weight, innov=0), LinkGene(2, 4, weight=weight, innov=1)]
+        return Genome(self.config, node_genes=node_genes, link_genes=link_genes)
+
+    def test_speciate_groups_compatible_genomes(self):
+        species_set = SpeciesSet(self.config)
+        report = species_set.speciate(self.genomes, 0)
+        keys = [species_set.get_species_key(g) for g in self.genomes]
+        assert report.n_species == 3
+        assert keys[0] == keys[1] == keys[2]
+        assert keys[3] == keys[4]
+        assert len(set(keys)) == 3
+
+    def test_species_keep_their_keys_across_generations(self):
+        species_set = SpeciesSet(self.config)
+        species_set.speciate(self.genomes, 0)
+        keys = [species_set.get_species_key(g) for g in self.genomes]
+        species_set.speciate(self.genomes[::-1], 1)
+        assert [species_set.get_species_key(g) for g in self.genomes] == keys
+
+    def test_speciate_reuses_cached_distances(self):
+        species_set = SpeciesSet(self.config)
+        first = species_set.speciate(self.genomes, 0)
+        second = species_set.speciate(self.genomes, 1)
+        assert first.cache_hits < first.distance_calls
+        assert second.cache_hits > 0
+        assert second.hit_rate > first.hit_rate
+        assert species_set.reports == [first, second]
+
+    def test_distance_cache_is_bounded(self):
+        species_set = SpeciesSet(self.config, cache_size=3)
+        species_set.speciate(self.genomes, 0)
+        assert len(species_set.distance_cache) <= 3